@@ -240,10 +240,11 @@ def create_default_agent_config():
     """Create default agent configuration when database is not available"""
     from models import AIAgent
     from datetime import datetime
+    from uuid import UUID
     
     return AIAgent(
-        id="default",
-        project_id="default",
+        id=UUID(int=0),
+        project_id=UUID(int=0),
         name="Default Call Center Agent",
         prompt="""You are a helpful AI assistant for a call center. 
         Be professional, courteous, and efficient in helping customers with their inquiries.
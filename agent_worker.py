@@ -198,7 +198,7 @@ class AgentWorkerManager:
             
             # Get pending calls for this campaign
             calls = await Call.find(
-                Call.campaign_id == campaign_id,
+                Call.campaign_id == campaign.id,
                 Call.call_status == "pending"
             ).to_list()
             
@@ -0,0 +1,67 @@
+"""
+ASGI middleware shared by the API app
+"""
+
+import zlib
+
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upper bound on a decompressed request body, so a small gzip bomb can't
+# exhaust memory
+MAX_DECOMPRESSED_BYTES = 32 * 1024 * 1024
+
+
+class GzipRequestMiddleware:
+    """Transparently decompress request bodies sent with Content-Encoding: gzip"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        if (b"content-encoding", b"gzip") not in ((k, v.lower()) for k, v in headers):
+            await self.app(scope, receive, send)
+            return
+
+        # Decompress incrementally as chunks arrive
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = []
+        size = 0
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                more_body = message.get("more_body", False)
+                chunk = decompressor.decompress(message.get("body", b""), MAX_DECOMPRESSED_BYTES - size + 1)
+                size += len(chunk)
+                if size > MAX_DECOMPRESSED_BYTES or decompressor.unconsumed_tail:
+                    response = PlainTextResponse("Request body too large", status_code=413)
+                    await response(scope, receive, send)
+                    return
+                chunks.append(chunk)
+            chunks.append(decompressor.flush())
+        except zlib.error:
+            response = PlainTextResponse("Invalid gzip body", status_code=400)
+            await response(scope, receive, send)
+            return
+
+        body = b"".join(chunks)
+        headers = [(k, v) for k, v in headers if k not in (b"content-encoding", b"content-length")]
+        headers.append((b"content-length", str(len(body)).encode()))
+        scope = dict(scope, headers=headers)
+
+        body_sent = False
+
+        async def receive_decompressed() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, receive_decompressed, send)
@@ -7,6 +7,7 @@ from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from datetime import datetime, timedelta
+from uuid import UUID
 import asyncio
 import logging
 import os
@@ -202,7 +203,7 @@ async def scale_agent(
             
             deployment = AgentDeployment(
                 agent_id=agent_id,
-                project_id=agent.project_id,
+                project_id=str(agent.project_id),
                 replicas=scale_up_count
             )
             
@@ -261,7 +262,7 @@ async def stop_agent_instance_endpoint(instance_id: str):
 
 
 @router.get("/stats/{agent_id}", response_model=AgentStats)
-async def get_agent_stats(agent_id: str, days: int = 7):
+async def get_agent_stats(agent_id: UUID, days: int = 7):
     """Get comprehensive stats for an agent"""
     
     try:
@@ -293,12 +294,12 @@ async def get_agent_stats(agent_id: str, days: int = 7):
         # Current load (based on active instances)
         current_instances = [
             inst for inst in agent_instances.values()
-            if inst.agent_id == agent_id and inst.status == "running"
+            if inst.agent_id == str(agent_id) and inst.status == "running"
         ]
         current_load = active_calls / len(current_instances) if current_instances else 0
         
         return AgentStats(
-            agent_id=agent_id,
+            agent_id=str(agent_id),
             total_calls=total_calls,
             active_calls=active_calls,
             completed_calls=completed_calls,
@@ -1,4 +1,5 @@
 from typing import List
+from uuid import UUID
 from fastapi import APIRouter, HTTPException, Query
 from models import AIAgent, AIAgentCreate, AIAgentUpdate, Project
 
@@ -26,7 +27,7 @@ async def create_ai_agent(agent_data: AIAgentCreate):
 
 @router.get("/", response_model=List[AIAgent])
 async def get_ai_agents(
-    project_id: str = Query(..., description="Project ID"),
+    project_id: UUID = Query(..., description="Project ID"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100)
 ):
@@ -39,7 +40,7 @@ async def get_ai_agents(
 
 
 @router.get("/{agent_id}", response_model=AIAgent)
-async def get_ai_agent(agent_id: str):
+async def get_ai_agent(agent_id: UUID):
     """Get a specific AI agent by ID"""
     agent = await AIAgent.get(agent_id)
     if not agent:
@@ -48,7 +49,7 @@ async def get_ai_agent(agent_id: str):
 
 
 @router.put("/{agent_id}", response_model=AIAgent)
-async def update_ai_agent(agent_id: str, agent_update: AIAgentUpdate):
+async def update_ai_agent(agent_id: UUID, agent_update: AIAgentUpdate):
     """Update an AI agent"""
     agent = await AIAgent.get(agent_id)
     if not agent:
@@ -58,25 +59,25 @@ async def update_ai_agent(agent_id: str, agent_update: AIAgentUpdate):
     if update_data:
         for field, value in update_data.items():
             setattr(agent, field, value)
-        await agent.save()
+        await agent.save_changes()
     
     return agent
 
 
 @router.delete("/{agent_id}")
-async def delete_ai_agent(agent_id: str):
+async def delete_ai_agent(agent_id: UUID):
     """Soft delete an AI agent"""
     agent = await AIAgent.get(agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="AI agent not found")
     
     agent.is_active = False
-    await agent.save()
+    await agent.save_changes()
     return {"message": "AI agent deleted successfully"}
 
 
 @router.post("/{agent_id}/test")
-async def test_ai_agent(agent_id: str, test_message: str):
+async def test_ai_agent(agent_id: UUID, test_message: str):
     """Test AI agent with a sample message"""
     agent = await AIAgent.get(agent_id)
     if not agent:
@@ -1,14 +1,18 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from uuid import UUID
 from fastapi import APIRouter, HTTPException, Query
-from models import Call, CallAnalytics, Project, AIAgent, Campaign
+from models import Call, CallAnalytics, CallListItem, Project, AIAgent, Campaign
 from pymongo import DESCENDING
 
 router = APIRouter()
 
+# Cursor batch size for endpoints that scan a project's calls
+STREAM_BATCH_SIZE = 500
+
 
 @router.get("/calls/{call_id}", response_model=CallAnalytics)
-async def get_call_analytics(call_id: str):
+async def get_call_analytics(call_id: UUID):
     """Get analytics for a specific call"""
     analytics = await CallAnalytics.find_one(CallAnalytics.call_id == call_id)
     if not analytics:
@@ -17,7 +21,7 @@ async def get_call_analytics(call_id: str):
 
 
 @router.post("/calls/{call_id}/analyze")
-async def analyze_call(call_id: str):
+async def analyze_call(call_id: UUID):
     """Analyze a call and generate analytics"""
     call = await Call.get(call_id)
     if not call:
@@ -59,7 +63,7 @@ async def analyze_call(call_id: str):
 
 @router.get("/project/{project_id}/summary")
 async def get_project_analytics_summary(
-    project_id: str,
+    project_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze")
 ):
     """Get analytics summary for a project"""
@@ -72,25 +76,30 @@ async def get_project_analytics_summary(
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get calls in date range
-    calls = await Call.find(
+    # Stream calls in date range, accumulating metrics as each batch arrives
+    total_calls = completed_calls = failed_calls = answered_calls = 0
+    total_duration = 0
+    call_ids = []
+    async for c in Call.find(
         Call.project_id == project_id,
         Call.started_at >= start_date,
-        Call.started_at <= end_date
-    ).to_list()
-    
-    # Calculate basic metrics
-    total_calls = len(calls)
-    completed_calls = len([c for c in calls if c.call_status == "completed"])
-    failed_calls = len([c for c in calls if c.call_status == "failed"])
-    answered_calls = len([c for c in calls if c.answered_at is not None])
+        Call.started_at <= end_date,
+        projection_model=CallListItem,
+        batch_size=STREAM_BATCH_SIZE
+    ):
+        total_calls += 1
+        if c.call_status == "completed":
+            completed_calls += 1
+            call_ids.append(c.id)
+        elif c.call_status == "failed":
+            failed_calls += 1
+        if c.answered_at is not None:
+            answered_calls += 1
+        total_duration += c.duration_seconds or 0
     
-    # Calculate durations
-    total_duration = sum([c.duration_seconds or 0 for c in calls])
     avg_duration = total_duration / completed_calls if completed_calls > 0 else 0
     
     # Get analytics for completed calls
-    call_ids = [c.id for c in calls if c.call_status == "completed"]
     analytics_list = await CallAnalytics.find(
         {"call_id": {"$in": call_ids}}
     ).to_list()
@@ -101,7 +110,7 @@ async def get_project_analytics_summary(
     total_interruptions = 0
     
     if analytics_list:
-        positive_emotions = [a.emotions.get("positive", 0) for a in analytics_list]
+        positive_emotions = [a.emotions.positive for a in analytics_list]
         avg_sentiment = sum(positive_emotions) / len(positive_emotions)
         
         satisfaction_scores = [a.customer_satisfaction_score for a in analytics_list if a.customer_satisfaction_score]
@@ -140,7 +149,7 @@ async def get_project_analytics_summary(
 
 @router.get("/project/{project_id}/trends")
 async def get_project_trends(
-    project_id: str,
+    project_id: UUID,
     days: int = Query(30, ge=7, le=365, description="Number of days for trend analysis")
 ):
     """Get trend data for a project"""
@@ -152,16 +161,15 @@ async def get_project_trends(
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get calls grouped by day
-    calls = await Call.find(
+    # Group calls by date, streaming them in day order
+    daily_stats = {}
+    async for call in Call.find(
         Call.project_id == project_id,
         Call.started_at >= start_date,
-        Call.started_at <= end_date
-    ).sort([("started_at", 1)]).to_list()
-    
-    # Group calls by date
-    daily_stats = {}
-    for call in calls:
+        Call.started_at <= end_date,
+        projection_model=CallListItem,
+        batch_size=STREAM_BATCH_SIZE
+    ).sort([("started_at", 1)]):
         date_key = call.started_at.strftime("%Y-%m-%d")
         if date_key not in daily_stats:
             daily_stats[date_key] = {
@@ -192,7 +200,7 @@ async def get_project_trends(
 
 @router.get("/project/{project_id}/agent-performance")
 async def get_agent_performance(
-    project_id: str,
+    project_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze")
 ):
     """Get performance metrics for all agents in a project"""
@@ -221,7 +229,8 @@ async def get_agent_performance(
             Call.project_id == project_id,
             Call.ai_agent_id == agent.id,
             Call.started_at >= start_date,
-            Call.started_at <= end_date
+            Call.started_at <= end_date,
+            projection_model=CallListItem
         ).to_list()
         
         if not calls:
@@ -256,7 +265,7 @@ async def get_agent_performance(
         avg_sentiment = 0
         avg_satisfaction = 0
         if analytics_list:
-            positive_emotions = [a.emotions.get("positive", 0) for a in analytics_list]
+            positive_emotions = [a.emotions.positive for a in analytics_list]
             avg_sentiment = sum(positive_emotions) / len(positive_emotions)
             
             satisfaction_scores = [a.customer_satisfaction_score for a in analytics_list if a.customer_satisfaction_score]
@@ -284,7 +293,7 @@ async def get_agent_performance(
 
 @router.get("/project/{project_id}/call-outcomes")
 async def get_call_outcomes_analysis(
-    project_id: str,
+    project_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze")
 ):
     """Get analysis of call outcomes for a project"""
@@ -296,23 +305,24 @@ async def get_call_outcomes_analysis(
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get calls with outcomes
-    calls = await Call.find(
+    # Group calls with outcomes by outcome
+    outcome_counts = {}
+    total_with_outcomes = 0
+    async for call in Call.find(
         Call.project_id == project_id,
         Call.started_at >= start_date,
         Call.started_at <= end_date,
-        Call.call_outcome != None
-    ).to_list()
-    
-    # Group by outcome
-    outcome_counts = {}
-    for call in calls:
+        Call.call_outcome != None,
+        projection_model=CallListItem,
+        batch_size=STREAM_BATCH_SIZE
+    ):
+        total_with_outcomes += 1
         outcome = call.call_outcome or "Unknown"
         outcome_counts[outcome] = outcome_counts.get(outcome, 0) + 1
     
     # Convert to list format
     outcomes = [
-        {"outcome": outcome, "count": count, "percentage": round(count / len(calls) * 100, 1)}
+        {"outcome": outcome, "count": count, "percentage": round(count / total_with_outcomes * 100, 1)}
         for outcome, count in outcome_counts.items()
     ]
     
@@ -322,14 +332,14 @@ async def get_call_outcomes_analysis(
     return {
         "project_id": project_id,
         "period_days": days,
-        "total_calls_with_outcomes": len(calls),
+        "total_calls_with_outcomes": total_with_outcomes,
         "outcomes": outcomes
     }
 
 
 @router.get("/project/{project_id}/export")
 async def export_project_data(
-    project_id: str,
+    project_id: UUID,
     format: str = Query("json", regex="^(json|csv)$", description="Export format"),
     days: int = Query(30, ge=1, le=365, description="Number of days to export"),
     include_transcripts: bool = Query(False, description="Include call transcripts")
@@ -343,16 +353,14 @@ async def export_project_data(
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get calls
-    calls = await Call.find(
+    # Prepare export data, streaming calls so only one batch of documents is alive at a time
+    export_data = []
+    async for call in Call.find(
         Call.project_id == project_id,
         Call.started_at >= start_date,
-        Call.started_at <= end_date
-    ).sort([("started_at", -1)]).to_list()
-    
-    # Prepare export data
-    export_data = []
-    for call in calls:
+        Call.started_at <= end_date,
+        batch_size=STREAM_BATCH_SIZE
+    ).sort([("started_at", -1)]):
         call_data = {
             "call_id": call.id,
             "phone_number": call.phone_number,
@@ -6,6 +6,7 @@ Real-time call analysis, transcription, and sentiment analysis
 import asyncio
 import logging
 from datetime import datetime
+from uuid import UUID
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
@@ -20,13 +21,17 @@ logger = logging.getLogger(__name__)
 
 # Analysis models
 class CallTranscriptRequest(BaseModel):
-    call_id: str
+    call_id: UUID
     transcript: str
     audio_url: Optional[str] = None
     speaker_labels: Optional[List[Dict]] = None
 
+class TranscriptSegmentsRequest(BaseModel):
+    call_id: UUID
+    segments: List[str]
+
 class CallAnalysisRequest(BaseModel):
-    call_id: str
+    call_id: UUID
     force_reanalysis: bool = False
 
 class SentimentAnalysisResult(BaseModel):
@@ -212,8 +217,37 @@ async def process_call_transcript(
         logger.error(f"Transcript processing failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/analyze/transcript/incremental")
+async def append_call_transcript(request: TranscriptSegmentsRequest):
+    """Append live transcript segments to a call without starting analysis"""
+    try:
+        if not request.segments:
+            return {"call_id": request.call_id, "appended": 0}
+        
+        text = "\n".join(request.segments)
+        # Append in a single pipeline update, so concurrent batches don't
+        # overwrite each other
+        result = await Call.get_motor_collection().update_one(
+            {"_id": request.call_id},
+            [{"$set": {"transcript": {"$cond": [
+                {"$gt": [{"$strLenCP": {"$ifNull": ["$transcript", ""]}}, 0]},
+                {"$concat": ["$transcript", "\n", text]},
+                text
+            ]}}}]
+        )
+        if not result.matched_count:
+            raise HTTPException(status_code=404, detail="Call not found")
+        
+        return {"call_id": request.call_id, "appended": len(request.segments)}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Transcript append failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/analyze/call/{call_id}")
-async def analyze_call(call_id: str, background_tasks: BackgroundTasks):
+async def analyze_call(call_id: UUID, background_tasks: BackgroundTasks):
     """Trigger comprehensive call analysis"""
     try:
         call = await Call.get(call_id)
@@ -240,7 +274,7 @@ async def analyze_call(call_id: str, background_tasks: BackgroundTasks):
         logger.error(f"Call analysis failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def analyze_call_complete(call_id: str, transcript: str):
+async def analyze_call_complete(call_id: UUID, transcript: str):
     """Complete call analysis (background task)"""
     try:
         logger.info(f"Starting complete analysis for call {call_id}")
@@ -297,7 +331,7 @@ async def analyze_call_complete(call_id: str, transcript: str):
         logger.error(f"Complete analysis failed for call {call_id}: {e}")
 
 @router.get("/analysis/{call_id}")
-async def get_call_analysis(call_id: str):
+async def get_call_analysis(call_id: UUID):
     """Get analysis results for a call"""
     try:
         analysis = await CallAnalysis.find_one(CallAnalysis.call_id == call_id)
@@ -311,12 +345,12 @@ async def get_call_analysis(call_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/analysis/project/{project_id}")
-async def get_project_analysis_summary(project_id: str):
+async def get_project_analysis_summary(project_id: UUID):
     """Get analysis summary for all calls in a project"""
     try:
         # Get all calls for project
         calls = await Call.find(Call.project_id == project_id).to_list()
-        call_ids = [str(call.id) for call in calls]
+        call_ids = [call.id for call in calls]
         
         # Get all analyses
         analyses = await CallAnalysis.find(
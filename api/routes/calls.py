@@ -1,32 +1,52 @@
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
-from models import Call, CallCreate, CallUpdate, Project, Contact, Campaign
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from models import BulkCallResult, Call, CallCreate, CallListItem, CallUpdate, Project, Contact, Campaign, bulk_create_calls
 
 router = APIRouter()
 
+# List responses are serialized in one pydantic-core pass instead of going
+# through FastAPI's per-item response_model validation and encoding
+CALL_LIST_ADAPTER = TypeAdapter(List[CallListItem])
 
-@router.post("/", response_model=Call)
-async def create_call(call_data: CallCreate):
-    """Create a new call record"""
-    # Verify project exists
-    project = await Project.get(call_data.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+
+def call_list_response(calls: List[CallListItem]) -> Response:
+    """JSON response for a page of call list rows"""
+    return Response(content=CALL_LIST_ADAPTER.dump_json(calls, by_alias=True), media_type="application/json")
+
+
+async def check_call_references(calls_data: List[CallCreate]):
+    """404 unless every call's project exists and its contact and campaign belong to that project.
     
-    # Verify contact exists if provided
-    if call_data.contact_id:
-        contact = await Contact.get(call_data.contact_id)
-        if not contact:
-            raise HTTPException(status_code=404, detail="Contact not found")
+    One query per referenced collection, however many calls are checked.
+    """
+    project_ids = {call_data.project_id for call_data in calls_data}
+    contact_ids = {call_data.contact_id for call_data in calls_data if call_data.contact_id}
+    campaign_ids = {call_data.campaign_id for call_data in calls_data if call_data.campaign_id}
     
-    # Verify campaign exists if provided
-    if call_data.campaign_id:
-        campaign = await Campaign.get(call_data.campaign_id)
-        if not campaign:
-            raise HTTPException(status_code=404, detail="Campaign not found")
+    projects = {p.id for p in await Project.find(Project.id.in_(list(project_ids))).to_list()}
+    contacts = {}
+    if contact_ids:
+        contacts = {c.id: c.project_id for c in await Contact.find(Contact.id.in_(list(contact_ids))).to_list()}
+    campaigns = {}
+    if campaign_ids:
+        campaigns = {c.id: c.project_id for c in await Campaign.find(Campaign.id.in_(list(campaign_ids))).to_list()}
     
-    call = Call(
+    for index, call_data in enumerate(calls_data):
+        where = f" (call {index})" if len(calls_data) > 1 else ""
+        if call_data.project_id not in projects:
+            raise HTTPException(status_code=404, detail=f"Project not found{where}")
+        if call_data.contact_id and contacts.get(call_data.contact_id) != call_data.project_id:
+            raise HTTPException(status_code=404, detail=f"Contact not found{where}")
+        if call_data.campaign_id and campaigns.get(call_data.campaign_id) != call_data.project_id:
+            raise HTTPException(status_code=404, detail=f"Campaign not found{where}")
+
+
+def call_from_create(call_data: CallCreate) -> Call:
+    """Build a call document from a create request"""
+    return Call(
         project_id=call_data.project_id,
         campaign_id=call_data.campaign_id,
         contact_id=call_data.contact_id,
@@ -34,15 +54,38 @@ async def create_call(call_data: CallCreate):
         call_type=call_data.call_type,
         phone_number=call_data.phone_number
     )
+
+
+@router.post("/", response_model=Call)
+async def create_call(call_data: CallCreate):
+    """Create a new call record"""
+    # Verify project, contact and campaign exist and belong together
+    await check_call_references([call_data])
+    
+    call = call_from_create(call_data)
     await call.save()
     return call
 
 
-@router.get("/", response_model=List[Call])
+@router.post("/bulk", response_model=BulkCallResult)
+async def create_calls_bulk(calls_data: List[CallCreate], response: Response):
+    """Create many call records in a single write, e.g. when fanning out a campaign.
+    
+    Responds 207 with the rejected rows listed when only some calls could be inserted.
+    """
+    await check_call_references(calls_data)
+    
+    inserted, failed = await bulk_create_calls([call_from_create(call_data) for call_data in calls_data])
+    if failed:
+        response.status_code = 207
+    return BulkCallResult(inserted=inserted, failed=failed)
+
+
+@router.get("/", response_model=List[CallListItem])
 async def get_calls(
-    project_id: str = Query(..., description="Project ID"),
-    contact_id: Optional[str] = Query(None, description="Filter by contact ID"),
-    campaign_id: Optional[str] = Query(None, description="Filter by campaign ID"),
+    project_id: UUID = Query(..., description="Project ID"),
+    contact_id: Optional[UUID] = Query(None, description="Filter by contact ID"),
+    campaign_id: Optional[UUID] = Query(None, description="Filter by campaign ID"),
     call_status: Optional[str] = Query(None, description="Filter by call status"),
     call_type: Optional[str] = Query(None, description="Filter by call type"),
     skip: int = Query(0, ge=0),
@@ -60,12 +103,12 @@ async def get_calls(
     if call_type:
         query_filter["call_type"] = call_type
     
-    calls = await Call.find(query_filter).sort([("started_at", -1)]).skip(skip).limit(limit).to_list()
-    return calls
+    calls = await Call.find(query_filter).sort([("started_at", -1)]).skip(skip).limit(limit).project(CallListItem).to_list()
+    return call_list_response(calls)
 
 
 @router.get("/{call_id}", response_model=Call)
-async def get_call(call_id: str):
+async def get_call(call_id: UUID):
     """Get a specific call by ID"""
     call = await Call.get(call_id)
     if not call:
@@ -74,7 +117,7 @@ async def get_call(call_id: str):
 
 
 @router.put("/{call_id}", response_model=Call)
-async def update_call(call_id: str, call_update: CallUpdate):
+async def update_call(call_id: UUID, call_update: CallUpdate):
     """Update a call record"""
     call = await Call.get(call_id)
     if not call:
@@ -90,7 +133,7 @@ async def update_call(call_id: str, call_update: CallUpdate):
 
 
 @router.delete("/{call_id}")
-async def delete_call(call_id: str):
+async def delete_call(call_id: UUID):
     """Delete a call record"""
     call = await Call.get(call_id)
     if not call:
@@ -101,7 +144,7 @@ async def delete_call(call_id: str):
 
 
 @router.post("/{call_id}/start")
-async def start_call(call_id: str, room_name: str, participant_id: Optional[str] = None):
+async def start_call(call_id: UUID, room_name: str, participant_id: Optional[str] = None):
     """Mark call as started and set LiveKit room info"""
     call = await Call.get(call_id)
     if not call:
@@ -117,7 +160,7 @@ async def start_call(call_id: str, room_name: str, participant_id: Optional[str]
 
 
 @router.post("/{call_id}/answer")
-async def answer_call(call_id: str):
+async def answer_call(call_id: UUID):
     """Mark call as answered"""
     call = await Call.get(call_id)
     if not call:
@@ -131,7 +174,7 @@ async def answer_call(call_id: str):
 
 
 @router.post("/{call_id}/end")
-async def end_call(call_id: str, call_outcome: Optional[str] = None):
+async def end_call(call_id: UUID, call_outcome: Optional[str] = None):
     """Mark call as ended"""
     call = await Call.get(call_id)
     if not call:
@@ -153,7 +196,7 @@ async def end_call(call_id: str, call_outcome: Optional[str] = None):
 
 
 @router.post("/{call_id}/fail")
-async def fail_call(call_id: str, reason: Optional[str] = None):
+async def fail_call(call_id: UUID, reason: Optional[str] = None):
     """Mark call as failed"""
     call = await Call.get(call_id)
     if not call:
@@ -172,11 +215,11 @@ async def fail_call(call_id: str, reason: Optional[str] = None):
 
 @router.post("/outbound")
 async def initiate_outbound_call(
-    project_id: str,
+    project_id: UUID,
     phone_number: str,
-    ai_agent_id: str,
-    contact_id: Optional[str] = None,
-    campaign_id: Optional[str] = None
+    ai_agent_id: UUID,
+    contact_id: Optional[UUID] = None,
+    campaign_id: Optional[UUID] = None
 ):
     """Initiate an outbound call using LiveKit SIP with enhanced agent integration"""
     import os
@@ -218,7 +261,7 @@ async def initiate_outbound_call(
             "contact_id": contact_id,
             "campaign_id": campaign_id,
             "agent_name": agent.name
-        })
+        }, default=str)
         
         room_request = api.CreateRoomRequest(
             name=room_name,
@@ -240,7 +283,7 @@ async def initiate_outbound_call(
                 "call_id": call.id,
                 "phone_number": phone_number,
                 "call_type": "outbound"
-            }),
+            }, default=str),
             # Enable audio and disable video for voice calls
             auto_subscribe=True,
             auto_publish=True
@@ -276,10 +319,10 @@ async def initiate_outbound_call(
         raise HTTPException(status_code=500, detail=f"Failed to initiate call: {str(e)}")
 
 
-@router.get("/contact/{contact_id}/history")
+@router.get("/contact/{contact_id}/history", response_model=List[CallListItem])
 async def get_contact_call_history(
-    contact_id: str,
-    project_id: str = Query(..., description="Project ID to filter calls"),
+    contact_id: UUID,
+    project_id: UUID = Query(..., description="Project ID to filter calls"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100)
 ):
@@ -287,6 +330,6 @@ async def get_contact_call_history(
     calls = await Call.find(
         Call.contact_id == contact_id,
         Call.project_id == project_id
-    ).sort([("started_at", -1)]).skip(skip).limit(limit).to_list()
+    ).sort([("started_at", -1)]).skip(skip).limit(limit).project(CallListItem).to_list()
     
-    return calls
\ No newline at end of file
+    return call_list_response(calls)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import List
+from uuid import UUID
 from fastapi import APIRouter, HTTPException, Query
-from models import Campaign, CampaignCreate, CampaignUpdate, Project, AIAgent
+from models import Call, Campaign, CampaignCreate, CampaignUpdate, Contact, Project, AIAgent, bulk_create_calls
 
 router = APIRouter()
 
@@ -33,7 +34,7 @@ async def create_campaign(campaign_data: CampaignCreate):
 
 @router.get("/", response_model=List[Campaign])
 async def get_campaigns(
-    project_id: str = Query(..., description="Project ID"),
+    project_id: UUID = Query(..., description="Project ID"),
     status: str = Query(None, description="Filter by status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100)
@@ -48,7 +49,7 @@ async def get_campaigns(
 
 
 @router.get("/{campaign_id}", response_model=Campaign)
-async def get_campaign(campaign_id: str):
+async def get_campaign(campaign_id: UUID):
     """Get a specific campaign by ID"""
     campaign = await Campaign.get(campaign_id)
     if not campaign:
@@ -57,7 +58,7 @@ async def get_campaign(campaign_id: str):
 
 
 @router.put("/{campaign_id}", response_model=Campaign)
-async def update_campaign(campaign_id: str, campaign_update: CampaignUpdate):
+async def update_campaign(campaign_id: UUID, campaign_update: CampaignUpdate):
     """Update a campaign"""
     campaign = await Campaign.get(campaign_id)
     if not campaign:
@@ -73,7 +74,7 @@ async def update_campaign(campaign_id: str, campaign_update: CampaignUpdate):
 
 
 @router.delete("/{campaign_id}")
-async def delete_campaign(campaign_id: str):
+async def delete_campaign(campaign_id: UUID):
     """Delete a campaign"""
     campaign = await Campaign.get(campaign_id)
     if not campaign:
@@ -84,7 +85,7 @@ async def delete_campaign(campaign_id: str):
 
 
 @router.post("/{campaign_id}/start")
-async def start_campaign(campaign_id: str):
+async def start_campaign(campaign_id: UUID):
     """Start a campaign"""
     campaign = await Campaign.get(campaign_id)
     if not campaign:
@@ -96,15 +97,36 @@ async def start_campaign(campaign_id: str):
     campaign.status = "active"
     await campaign.save()
     
-    # Here you would trigger the actual campaign logic
     # For group calls, create LiveKit rooms
-    # For individual calls, queue them for processing
+    # For individual and batch calls, queue one pending call per project contact
+    # in a single write; the agent worker picks them up from there
+    queued, failed = [], []
+    if campaign.campaign_type != "group":
+        contacts = await Contact.find(Contact.project_id == campaign.project_id).to_list()
+        calls = [
+            Call(
+                project_id=campaign.project_id,
+                campaign_id=campaign.id,
+                contact_id=contact.id,
+                ai_agent_id=campaign.ai_agent_id,
+                call_type="outbound",
+                phone_number=contact.phone_number,
+                call_status="pending"
+            )
+            for contact in contacts
+        ]
+        queued, failed = await bulk_create_calls(calls)
     
-    return {"message": "Campaign started successfully", "campaign_id": campaign_id}
+    return {
+        "message": "Campaign started successfully",
+        "campaign_id": campaign_id,
+        "calls_queued": len(queued),
+        "calls_failed": failed
+    }
 
 
 @router.post("/{campaign_id}/pause")
-async def pause_campaign(campaign_id: str):
+async def pause_campaign(campaign_id: UUID):
     """Pause a campaign"""
     campaign = await Campaign.get(campaign_id)
     if not campaign:
@@ -120,7 +142,7 @@ async def pause_campaign(campaign_id: str):
 
 
 @router.post("/{campaign_id}/complete")
-async def complete_campaign(campaign_id: str):
+async def complete_campaign(campaign_id: UUID):
     """Mark campaign as completed"""
     campaign = await Campaign.get(campaign_id)
     if not campaign:
@@ -133,7 +155,7 @@ async def complete_campaign(campaign_id: str):
 
 
 @router.get("/{campaign_id}/stats")
-async def get_campaign_stats(campaign_id: str):
+async def get_campaign_stats(campaign_id: UUID):
     """Get campaign statistics"""
     from models import Call
     
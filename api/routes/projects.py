@@ -1,4 +1,5 @@
 from typing import List
+from uuid import UUID
 from fastapi import APIRouter, HTTPException, Query
 from models import Project, ProjectCreate, ProjectUpdate
 
@@ -32,7 +33,7 @@ async def get_projects(
 
 
 @router.get("/{project_id}", response_model=Project)
-async def get_project(project_id: str):
+async def get_project(project_id: UUID):
     """Get a specific project by ID"""
     project = await Project.get(project_id)
     if not project:
@@ -41,7 +42,7 @@ async def get_project(project_id: str):
 
 
 @router.put("/{project_id}", response_model=Project)
-async def update_project(project_id: str, project_update: ProjectUpdate):
+async def update_project(project_id: UUID, project_update: ProjectUpdate):
     """Update a project"""
     project = await Project.get(project_id)
     if not project:
@@ -51,25 +52,25 @@ async def update_project(project_id: str, project_update: ProjectUpdate):
     if update_data:
         for field, value in update_data.items():
             setattr(project, field, value)
-        await project.save()
+        await project.save_changes()
     
     return project
 
 
 @router.delete("/{project_id}")
-async def delete_project(project_id: str):
+async def delete_project(project_id: UUID):
     """Soft delete a project"""
     project = await Project.get(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     project.is_active = False
-    await project.save()
+    await project.save_changes()
     return {"message": "Project deleted successfully"}
 
 
 @router.get("/{project_id}/stats")
-async def get_project_stats(project_id: str):
+async def get_project_stats(project_id: UUID):
     """Get project statistics"""
     from models import Call, Contact, Campaign, AIAgent
     
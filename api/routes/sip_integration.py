@@ -3,13 +3,20 @@ Enhanced SIP Integration for LiveKit Call Center
 Modern SIP handling with improved error handling and monitoring
 """
 
-from typing import Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import Optional, Dict, Any, Tuple
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+import asyncio
+import hashlib
 import os
+import re
 import json
 import logging
 from datetime import datetime
+from uuid import UUID
+
+import orjson
 
 from livekit import api
 from models import Call, AIAgent, Project, Contact
@@ -18,18 +25,57 @@ from database import get_database
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Per-minute rates keyed by E.164 prefix (mock values until real rate tables
+# are wired in). SIP_RATE_TABLE may point to a JSON file of {"prefix": rate}
+# entries that override/extend these defaults.
+DEFAULT_CALL_RATE = 0.10  # $0.10 per minute for international
+_CALL_RATES: Dict[str, float] = {
+    "+1": 0.02,   # US/Canada
+    "+44": 0.05,  # UK
+}
+
+
+def _load_call_rates() -> None:
+    rate_table_path = os.getenv("SIP_RATE_TABLE")
+    if not rate_table_path:
+        return
+    try:
+        with open(rate_table_path) as f:
+            _CALL_RATES.update({str(k): float(v) for k, v in json.load(f).items()})
+    except Exception as e:
+        logger.error(f"Failed to load SIP rate table {rate_table_path}: {e}")
+
+
+_load_call_rates()
+_CALL_RATE_PREFIX_LENGTHS = sorted({len(prefix) for prefix in _CALL_RATES}, reverse=True)
+
+# E.164: leading "+", no leading zero in the country code, up to 15 digits
+_E164_PATTERN = re.compile(r"\+[1-9]\d{6,14}")
+
+# In-progress SIP calls, as polled by the dashboard endpoints
+_ACTIVE_SIP_CALLS_FILTER = {"call_status": {"$in": ["ringing", "answered"]}, "sip_call_id": {"$ne": None}}
+_POLL_CACHE_CONTROL = "max-age=2"
+
+# Concurrent outbound call initiations admitted against the SIP trunk
+SIP_MAX_CONCURRENT = int(os.getenv("SIP_MAX_CONCURRENT", "100"))
+_SIP_CALL_SLOTS = asyncio.Semaphore(SIP_MAX_CONCURRENT)
+
+# Serialized agent_config blocks for room metadata, keyed by (agent id, updated_at)
+_AGENT_CONFIG_CACHE_SIZE = 512
+_agent_config_cache: Dict[tuple, bytes] = {}
+
 
 class SIPCallRequest(BaseModel):
-    project_id: str
-    agent_id: str
+    project_id: UUID
+    agent_id: UUID
     phone_number: str
-    contact_id: Optional[str] = None
-    campaign_id: Optional[str] = None
+    contact_id: Optional[UUID] = None
+    campaign_id: Optional[UUID] = None
     call_options: Optional[Dict[str, Any]] = None
 
 
 class SIPCallResponse(BaseModel):
-    call_id: str
+    call_id: UUID
     sip_call_id: str
     room_name: str
     participant_identity: str
@@ -44,11 +90,11 @@ class SIPTrunkInfo(BaseModel):
     inbound_number: str
     outbound_enabled: bool
     concurrent_calls: int
-    max_concurrent_calls: int
+    max_concurrent_initiations: int
 
 
 class SIPCallEvent(BaseModel):
-    call_id: str
+    call_id: UUID
     event_type: str  # 'ringing', 'answered', 'ended', 'failed'
     timestamp: datetime
     details: Optional[Dict[str, Any]] = None
@@ -61,144 +107,165 @@ async def initiate_sip_call(
 ):
     """Initiate an enhanced SIP outbound call with comprehensive monitoring"""
     
-    try:
-        # Validate project and agent
-        project = await Project.get(request.project_id)
-        if not project or not project.is_active:
-            raise HTTPException(status_code=404, detail="Project not found or inactive")
-        
-        agent = await AIAgent.get(request.agent_id)
-        if not agent or not agent.is_active:
-            raise HTTPException(status_code=404, detail="Agent not found or inactive")
-        
-        # Validate contact if provided
-        contact = None
-        if request.contact_id:
-            contact = await Contact.get(request.contact_id)
-            if not contact:
+    if not _E164_PATTERN.fullmatch(request.phone_number):
+        raise HTTPException(status_code=400, detail="phone_number must be in E.164 format (e.g. +14155550123)")
+    
+    # Shed load at the door rather than queueing INVITEs behind a full trunk
+    if _SIP_CALL_SLOTS.locked():
+        raise HTTPException(status_code=503, detail="SIP trunk saturated, retry later")
+    
+    async with _SIP_CALL_SLOTS:
+        try:
+            # Fetch project, agent and (optional) contact concurrently
+            project, agent, contact = await asyncio.gather(
+                Project.get(request.project_id),
+                AIAgent.get(request.agent_id),
+                Contact.get(request.contact_id) if request.contact_id else _none(),
+            )
+            
+            # Validate project and agent
+            if not project or not project.is_active:
+                raise HTTPException(status_code=404, detail="Project not found or inactive")
+            
+            if not agent or not agent.is_active:
+                raise HTTPException(status_code=404, detail="Agent not found or inactive")
+            
+            # Validate contact if provided
+            if request.contact_id and not contact:
                 raise HTTPException(status_code=404, detail="Contact not found")
-        
-        # Initialize LiveKit API
-        livekit_api = api.LiveKitAPI(
-            url=os.getenv("LIVEKIT_URL"),
-            api_key=os.getenv("LIVEKIT_API_KEY"),
-            api_secret=os.getenv("LIVEKIT_API_SECRET")
-        )
-        
-        # Create call record
-        call = Call(
-            project_id=request.project_id,
-            campaign_id=request.campaign_id,
-            contact_id=request.contact_id,
-            ai_agent_id=request.agent_id,
-            call_type="outbound",
-            phone_number=request.phone_number,
-            call_status="initiating"
-        )
-        await call.save()
-        
-        # Prepare room configuration
-        room_name = f"sip-call-{call.id}"
-        room_metadata = {
-            "call_id": call.id,
-            "agent_id": request.agent_id,
-            "project_id": request.project_id,
-            "phone_number": request.phone_number,
-            "call_type": "outbound",
-            "agent_config": {
-                "name": agent.name,
-                "prompt": agent.prompt,
-                "voice_settings": agent.voice_settings,
-                "behavior_settings": agent.behavior_settings
-            }
-        }
-        
-        if contact:
-            room_metadata["contact_info"] = {
-                "id": contact.id,
-                "name": contact.name,
-                "email": contact.email,
-                "notes": contact.notes,
-                "tags": contact.tags
-            }
-        
-        # Create room with enhanced configuration
-        room_request = api.CreateRoomRequest(
-            name=room_name,
-            metadata=json.dumps(room_metadata),
-            max_participants=5,  # Agent + customer + potential transfers
-            empty_timeout=600,   # 10 minutes
-            departure_timeout=120,  # 2 minutes
-        )
-        
-        room = await livekit_api.room.create_room(room_request)
-        
-        # Configure SIP participant with enhanced options
-        call_options = request.call_options or {}
-        
-        sip_participant_request = api.CreateSIPParticipantRequest(
-            sip_trunk_id=os.getenv("SIP_TRUNK_ID"),
-            sip_call_to=request.phone_number,
-            room_name=room_name,
-            participant_identity=f"customer-{call.id}",
-            participant_name=contact.name if contact else f"Caller {request.phone_number}",
-            participant_metadata=json.dumps({
+            
+            # Initialize LiveKit API
+            livekit_api = api.LiveKitAPI(
+                url=os.getenv("LIVEKIT_URL"),
+                api_key=os.getenv("LIVEKIT_API_KEY"),
+                api_secret=os.getenv("LIVEKIT_API_SECRET")
+            )
+            
+            # Create call record
+            call = Call(
+                project_id=request.project_id,
+                campaign_id=request.campaign_id,
+                contact_id=request.contact_id,
+                ai_agent_id=request.agent_id,
+                call_type="outbound",
+                phone_number=request.phone_number,
+                call_status="initiating"
+            )
+            
+            # Prepare room configuration
+            room_name = f"sip-call-{call.id}"
+            room_metadata = {
                 "call_id": call.id,
+                "agent_id": request.agent_id,
+                "project_id": request.project_id,
                 "phone_number": request.phone_number,
-                "type": "sip_participant"
-            }),
-            # Enhanced SIP options
-            auto_subscribe=True,
-            auto_publish=True,
-            # Add custom headers if needed
-            headers=call_options.get("sip_headers", {}),
-            # Set call timeout
-            ringing_timeout=call_options.get("ringing_timeout", 30),
-            max_call_duration=call_options.get("max_duration", 3600)  # 1 hour max
-        )
-        
-        sip_participant = await livekit_api.sip.create_sip_participant(sip_participant_request)
-        
-        # Update call record with SIP details
-        call.room_name = room_name
-        call.sip_call_id = sip_participant.sip_call_id
-        call.participant_id = sip_participant.participant_identity
-        call.call_status = "ringing"
-        await call.save()
-        
-        # Schedule monitoring task
-        background_tasks.add_task(monitor_sip_call, call.id, room_name)
-        
-        # Calculate estimated cost (mock calculation)
-        estimated_cost = calculate_call_cost(request.phone_number)
-        
-        return SIPCallResponse(
-            call_id=call.id,
-            sip_call_id=sip_participant.sip_call_id,
-            room_name=room_name,
-            participant_identity=sip_participant.participant_identity,
-            status="ringing",
-            estimated_cost=estimated_cost
-        )
-        
-    except Exception as e:
-        logger.error(f"Failed to initiate SIP call: {e}")
-        
-        # Update call record if it was created
-        if 'call' in locals():
-            call.call_status = "failed"
-            call.call_outcome = f"Initiation failed: {str(e)}"
-            call.ended_at = datetime.utcnow()
+                "call_type": "outbound",
+            }
+            
+            if contact:
+                room_metadata["contact_info"] = {
+                    "id": contact.id,
+                    "name": contact.name,
+                    "email": contact.email,
+                    "notes": contact.notes,
+                    "tags": contact.tags
+                }
+            
+            # Create room with enhanced configuration
+            room_request = api.CreateRoomRequest(
+                name=room_name,
+                metadata=build_room_metadata(room_metadata, agent),
+                max_participants=5,  # Agent + customer + potential transfers
+                empty_timeout=600,   # 10 minutes
+                departure_timeout=120,  # 2 minutes
+            )
+            
+            # The call id is generated client-side, so the record insert and room
+            # creation don't depend on each other. Both are allowed to finish
+            # before any failure is raised, so the "failed" save below can't
+            # race the in-flight insert
+            saved, room = await asyncio.gather(
+                call.save(),
+                livekit_api.room.create_room(room_request),
+                return_exceptions=True
+            )
+            for result in (saved, room):
+                if isinstance(result, BaseException):
+                    raise result
+            
+            # Configure SIP participant with enhanced options
+            call_options = request.call_options or {}
+            
+            sip_participant_request = api.CreateSIPParticipantRequest(
+                sip_trunk_id=os.getenv("SIP_TRUNK_ID"),
+                sip_call_to=request.phone_number,
+                room_name=room_name,
+                participant_identity=f"customer-{call.id}",
+                participant_name=contact.name if contact else f"Caller {request.phone_number}",
+                participant_metadata=orjson.dumps({
+                    "call_id": call.id,
+                    "phone_number": request.phone_number,
+                    "type": "sip_participant"
+                }).decode(),
+                # Enhanced SIP options
+                auto_subscribe=True,
+                auto_publish=True,
+                # Add custom headers if needed
+                headers=call_options.get("sip_headers", {}),
+                # Set call timeout
+                ringing_timeout=call_options.get("ringing_timeout", 30),
+                max_call_duration=call_options.get("max_duration", 3600)  # 1 hour max
+            )
+            
+            sip_participant = await livekit_api.sip.create_sip_participant(sip_participant_request)
+            
+            # Update call record with SIP details
+            call.room_name = room_name
+            call.sip_call_id = sip_participant.sip_call_id
+            call.participant_id = sip_participant.participant_identity
+            call.call_status = "ringing"
             await call.save()
-        
-        raise HTTPException(status_code=500, detail=f"Failed to initiate SIP call: {str(e)}")
+            
+            # Schedule monitoring task
+            background_tasks.add_task(monitor_sip_call, call.id, room_name)
+            
+            # Calculate estimated cost (mock calculation)
+            estimated_cost = calculate_call_cost(request.phone_number)
+            
+            return SIPCallResponse(
+                call_id=call.id,
+                sip_call_id=sip_participant.sip_call_id,
+                room_name=room_name,
+                participant_identity=sip_participant.participant_identity,
+                status="ringing",
+                estimated_cost=estimated_cost
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to initiate SIP call: {e}")
+            
+            # Update call record if it was created
+            if 'call' in locals():
+                call.call_status = "failed"
+                call.call_outcome = f"Initiation failed: {str(e)}"
+                call.ended_at = datetime.utcnow()
+                await call.save()
+            
+            raise HTTPException(status_code=500, detail=f"Failed to initiate SIP call: {str(e)}")
 
 
 @router.get("/trunk/status", response_model=SIPTrunkInfo)
-async def get_sip_trunk_status():
+async def get_sip_trunk_status(request: Request, response: Response):
     """Get current SIP trunk status and capacity"""
     
     try:
+        # Count active SIP calls
+        active_calls, etag = await active_sip_calls_etag()
+        if request.headers.get("if-none-match") == etag:
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = _POLL_CACHE_CONTROL
+        
         livekit_api = api.LiveKitAPI(
             url=os.getenv("LIVEKIT_URL"),
             api_key=os.getenv("LIVEKIT_API_KEY"),
@@ -211,12 +278,6 @@ async def get_sip_trunk_status():
         # In a real implementation, you would call the LiveKit SIP API
         # For now, we'll return mock data
         
-        # Count active SIP calls
-        active_calls = await Call.find(
-            Call.call_status.in_(["ringing", "answered"]),
-            Call.sip_call_id != None
-        ).count()
-        
         return SIPTrunkInfo(
             trunk_id=trunk_id,
             name="Main SIP Trunk",
@@ -224,7 +285,7 @@ async def get_sip_trunk_status():
             inbound_number="+1234567890",  # This would come from trunk config
             outbound_enabled=True,
             concurrent_calls=active_calls,
-            max_concurrent_calls=100  # This would come from trunk limits
+            max_concurrent_initiations=SIP_MAX_CONCURRENT
         )
         
     except Exception as e:
@@ -245,24 +306,28 @@ async def handle_sip_webhook(event_data: Dict[str, Any]):
             return {"status": "ignored", "reason": "not a SIP call room"}
         
         # Extract call ID from room name
-        call_id = room_name.replace("sip-call-", "")
-        
-        call = await Call.get(call_id)
-        if not call:
-            logger.warning(f"Call {call_id} not found for SIP event")
-            return {"status": "error", "reason": "call not found"}
-        
-        # Process different event types
+        try:
+            call_id = UUID(room_name[len("sip-call-"):])
+        except ValueError:
+            return {"status": "ignored", "reason": "malformed call id in room name"}
+        
+        # Process different event types. Status transitions are applied as
+        # single atomic updates, so the Call document is never fetched here.
+        found = True
         if event_type == "participant_joined":
-            await handle_participant_joined(call, participant)
+            found = await handle_participant_joined(call_id, participant)
         elif event_type == "participant_left":
-            await handle_participant_left(call, participant)
+            found = await handle_participant_left(call_id, participant)
         elif event_type == "room_finished":
-            await handle_room_finished(call)
+            await handle_room_finished(call_id)
         elif event_type == "track_published":
-            await handle_track_event(call, "track_published", event_data)
+            await handle_track_event(call_id, "track_published", event_data)
         elif event_type == "track_unpublished":
-            await handle_track_event(call, "track_unpublished", event_data)
+            await handle_track_event(call_id, "track_unpublished", event_data)
+        
+        if not found:
+            logger.warning(f"Call {call_id} not found for SIP event")
+            return {"status": "error", "reason": "call not found"}
         
         # Log event for analytics
         await log_sip_event(call_id, event_type, event_data)
@@ -275,15 +340,20 @@ async def handle_sip_webhook(event_data: Dict[str, Any]):
 
 
 @router.get("/calls/active")
-async def get_active_sip_calls():
+async def get_active_sip_calls(request: Request):
     """Get all currently active SIP calls"""
     
     try:
+        _, etag = await active_sip_calls_etag()
+        if request.headers.get("if-none-match") == etag:
+            return not_modified(etag)
+        
         active_calls = await Call.find(
             Call.call_status.in_(["ringing", "answered"]),
             Call.sip_call_id != None
         ).to_list()
         
+        now = datetime.utcnow()
         call_summaries = []
         for call in active_calls:
             # Get agent info
@@ -294,16 +364,20 @@ async def get_active_sip_calls():
                 "phone_number": call.phone_number,
                 "status": call.call_status,
                 "started_at": call.started_at,
-                "duration": (datetime.utcnow() - call.started_at).total_seconds() if call.started_at else 0,
+                "duration": (now - call.started_at).total_seconds() if call.started_at else 0,
                 "agent_name": agent.name if agent else "Unknown",
                 "room_name": call.room_name,
                 "sip_call_id": call.sip_call_id
             })
         
-        return {
-            "active_calls": len(call_summaries),
-            "calls": call_summaries
-        }
+        # Plain dict payload serialized by orjson directly, skipping jsonable_encoder
+        return ORJSONResponse(
+            {
+                "active_calls": len(call_summaries),
+                "calls": call_summaries
+            },
+            headers={"ETag": etag, "Cache-Control": _POLL_CACHE_CONTROL}
+        )
         
     except Exception as e:
         logger.error(f"Error getting active SIP calls: {e}")
@@ -312,7 +386,7 @@ async def get_active_sip_calls():
 
 @router.post("/calls/{call_id}/transfer")
 async def transfer_sip_call(
-    call_id: str,
+    call_id: UUID,
     destination: str,
     transfer_type: str = "attended"  # "attended" or "blind"
 ):
@@ -353,9 +427,13 @@ async def transfer_sip_call(
 
 # Helper functions
 
-async def monitor_sip_call(call_id: str, room_name: str):
+async def _none() -> None:
+    """Placeholder awaitable for optional lookups passed to asyncio.gather"""
+    return None
+
+
+async def monitor_sip_call(call_id: UUID, room_name: str):
     """Background task to monitor SIP call progress"""
-    import asyncio
     
     try:
         # Wait for call to be answered or fail
@@ -387,73 +465,133 @@ async def monitor_sip_call(call_id: str, room_name: str):
         logger.error(f"Error monitoring SIP call {call_id}: {e}")
 
 
+async def active_sip_calls_etag() -> Tuple[int, str]:
+    """Count active SIP calls and derive a weak ETag from their state in one aggregation"""
+    rows = await Call.get_motor_collection().aggregate([
+        {"$match": _ACTIVE_SIP_CALLS_FILTER},
+        {"$group": {
+            "_id": None,
+            "count": {"$sum": 1},
+            "last_started": {"$max": "$started_at"},
+            "last_answered": {"$max": "$answered_at"}
+        }}
+    ]).to_list(1)
+    stats = rows[0] if rows else {}
+    count = stats.get("count", 0)
+    fingerprint = f"{count}-{stats.get('last_started')}-{stats.get('last_answered')}"
+    return count, f'W/"{hashlib.blake2b(fingerprint.encode(), digest_size=8).hexdigest()}"'
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for pollers whose If-None-Match is still current"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _POLL_CACHE_CONTROL})
+
+
+def agent_config_json(agent: AIAgent) -> bytes:
+    """Serialized agent_config metadata block, reused until the agent is updated"""
+    key = (agent.id, agent.updated_at)
+    payload = _agent_config_cache.get(key)
+    if payload is None:
+        payload = orjson.dumps({
+            "name": agent.name,
+            "prompt": agent.prompt,
+            "voice_settings": agent.voice_settings,
+            "behavior_settings": agent.behavior_settings
+        })
+        if len(_agent_config_cache) >= _AGENT_CONFIG_CACHE_SIZE:
+            _agent_config_cache.pop(next(iter(_agent_config_cache)))
+        _agent_config_cache[key] = payload
+    return payload
+
+
+def build_room_metadata(room_metadata: Dict[str, Any], agent: AIAgent) -> str:
+    """Serialize room metadata, splicing in the cached agent_config block"""
+    return (
+        orjson.dumps(room_metadata)[:-1]
+        + b',"agent_config":'
+        + agent_config_json(agent)
+        + b"}"
+    ).decode()
+
+
 def calculate_call_cost(phone_number: str) -> float:
     """Calculate estimated call cost based on destination"""
-    # Mock implementation - in reality, this would use rate tables
-    if phone_number.startswith("+1"):  # US/Canada
-        return 0.02  # $0.02 per minute
-    elif phone_number.startswith("+44"):  # UK
-        return 0.05  # $0.05 per minute
-    else:
-        return 0.10  # $0.10 per minute for international
+    # Longest-prefix match: probe one dict lookup per distinct prefix length
+    for length in _CALL_RATE_PREFIX_LENGTHS:
+        rate = _CALL_RATES.get(phone_number[:length])
+        if rate is not None:
+            return rate
+    return DEFAULT_CALL_RATE
 
 
-async def handle_participant_joined(call: Call, participant: Dict[str, Any]):
-    """Handle participant joined event"""
+async def handle_participant_joined(call_id: UUID, participant: Dict[str, Any]) -> bool:
+    """Handle participant joined event. Returns False if the call doesn't exist."""
     try:
         if participant.get("identity", "").startswith("customer-"):
-            call.call_status = "answered"
-            call.answered_at = datetime.utcnow()
-            await call.save()
-            logger.info(f"Call {call.id} answered")
+            result = await Call.get_motor_collection().update_one(
+                {"_id": call_id},
+                {"$set": {"call_status": "answered", "answered_at": datetime.utcnow()}}
+            )
+            if not result.matched_count:
+                return False
+            logger.info(f"Call {call_id} answered")
     except Exception as e:
         logger.error(f"Error handling participant joined: {e}")
+    return True
 
 
-async def handle_participant_left(call: Call, participant: Dict[str, Any]):
-    """Handle participant left event"""
+async def handle_participant_left(call_id: UUID, participant: Dict[str, Any]) -> bool:
+    """Handle participant left event. Returns False if the call doesn't exist."""
     try:
         if participant.get("identity", "").startswith("customer-"):
-            call.call_status = "completed"
-            call.ended_at = datetime.utcnow()
-            
-            if call.answered_at:
-                duration = (call.ended_at - call.answered_at).total_seconds()
-                call.duration_seconds = int(duration)
-            
-            await call.save()
-            logger.info(f"Call {call.id} completed")
+            # Pipeline update so duration is computed from the stored
+            # answered_at in the same write (null if never answered)
+            result = await Call.get_motor_collection().update_one(
+                {"_id": call_id},
+                [{"$set": {
+                    "call_status": "completed",
+                    "ended_at": "$$NOW",
+                    "duration_seconds": {
+                        "$dateDiff": {"startDate": "$answered_at", "endDate": "$$NOW", "unit": "second"}
+                    }
+                }}]
+            )
+            if not result.matched_count:
+                return False
+            logger.info(f"Call {call_id} completed")
     except Exception as e:
         logger.error(f"Error handling participant left: {e}")
+    return True
 
 
-async def handle_room_finished(call: Call):
+async def handle_room_finished(call_id: UUID):
     """Handle room finished event"""
     try:
-        if call.call_status not in ["completed", "failed"]:
-            call.call_status = "completed"
-            call.ended_at = datetime.utcnow()
-            await call.save()
-            logger.info(f"Room finished for call {call.id}")
+        result = await Call.get_motor_collection().update_one(
+            {"_id": call_id, "call_status": {"$nin": ["completed", "failed"]}},
+            {"$set": {"call_status": "completed", "ended_at": datetime.utcnow()}}
+        )
+        if result.modified_count:
+            logger.info(f"Room finished for call {call_id}")
     except Exception as e:
         logger.error(f"Error handling room finished: {e}")
 
 
-async def handle_track_event(call: Call, event_type: str, event_data: Dict[str, Any]):
+async def handle_track_event(call_id: UUID, event_type: str, event_data: Dict[str, Any]):
     """Handle track published/unpublished events"""
     try:
         track = event_data.get("track", {})
         track_type = track.get("type")
         
         if track_type == "audio":
-            logger.info(f"Audio track {event_type} for call {call.id}")
+            logger.info(f"Audio track {event_type} for call {call_id}")
             # Could update call analytics here
         
     except Exception as e:
         logger.error(f"Error handling track event: {e}")
 
 
-async def log_sip_event(call_id: str, event_type: str, event_data: Dict[str, Any]):
+async def log_sip_event(call_id: UUID, event_type: str, event_data: Dict[str, Any]):
     """Log SIP events for analytics and debugging"""
     try:
         # In a production system, you might want to store these in a separate events table
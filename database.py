@@ -3,14 +3,13 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from dotenv import load_dotenv
 
-from models import (
-    Project, AIAgent, Contact, Campaign, Call, 
-    CallAnalytics, CallAnalysis, GroupCall, GroupCallParticipant
-)
+from models import DOCUMENT_MODELS
 
 load_dotenv()
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017/livekit_callcenter")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "200"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
 
 
 class Database:
@@ -23,23 +22,25 @@ db = Database()
 
 async def connect_to_mongo():
     """Create database connection"""
-    db.client = AsyncIOMotorClient(MONGODB_URL)
+    # Sized for bursty SIP webhook traffic; compressors the server or driver
+    # doesn't support are skipped by pymongo during negotiation
+    db.client = AsyncIOMotorClient(
+        MONGODB_URL,
+        maxPoolSize=MONGODB_MAX_POOL_SIZE,
+        minPoolSize=MONGODB_MIN_POOL_SIZE,
+        compressors="zstd,snappy",
+        serverSelectionTimeoutMS=3000,
+        retryWrites=True,
+        uuidRepresentation="standard",
+    )
     db.database = db.client.get_default_database()
     
     # Initialize beanie with the document models
     await init_beanie(
         database=db.database,
-        document_models=[
-            Project,
-            AIAgent,
-            Contact,
-            Campaign,
-            Call,
-            CallAnalytics,
-            CallAnalysis,
-            GroupCall,
-            GroupCallParticipant,
-        ]
+        document_models=list(DOCUMENT_MODELS),
+        # Drop indexes no longer declared on the models
+        allow_index_dropping=True,
     )
 
 
@@ -3,16 +3,24 @@ Enhanced LiveKit Agent with call analysis integration
 """
 
 import asyncio
+import gzip
+import io
 import logging
 import os
+import time
+import zlib
 import httpx
+import orjson
+from cachetools import TTLCache
 from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
 
 from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     RunContext,
     WorkerOptions,
     cli,
@@ -24,9 +32,67 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global variables for call tracking
-current_calls = {}
-transcript_buffer = {}
+# Global variables for call tracking. Entries are removed when a call ends;
+# the TTL only reclaims ones left behind by a crashed job, so it is set well
+# above the longest call (max_call_duration is 1 hour).
+CALL_TRACKING_MAX_ENTRIES = 10_000
+CALL_TRACKING_TTL = 2 * 3600
+current_calls = TTLCache(maxsize=CALL_TRACKING_MAX_ENTRIES, ttl=CALL_TRACKING_TTL)
+transcript_buffer = TTLCache(maxsize=CALL_TRACKING_MAX_ENTRIES, ttl=CALL_TRACKING_TTL)
+
+# Live transcript segments are streamed in batches of this many lines, or
+# after this many seconds, whichever comes first
+TRANSCRIPT_FLUSH_SEGMENTS = 16
+TRANSCRIPT_FLUSH_INTERVAL = 5.0
+
+# Call status updates are coalesced per call, up to this many queued
+# updates or this many seconds per batch
+STATUS_BATCH_SIZE = 32
+STATUS_BATCH_WINDOW = 0.2
+_status_queue: Optional[asyncio.Queue] = None
+_status_worker: Optional[asyncio.Task] = None
+
+# Shared keep-alive client for backend API calls
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            # Pool limits and http2 live on the transport when one is given.
+            # retries re-attempts failed connects (ConnectError/ConnectTimeout);
+            # a request that reached the server is never replayed.
+            transport=httpx.AsyncHTTPTransport(
+                retries=3,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                # Multiplexes requests when the backend is reached over TLS (ALPN);
+                # plain http:// URLs keep using HTTP/1.1 keep-alive
+                http2=True,
+            ),
+            # Request bodies are pre-encoded with orjson
+            headers={"Content-Type": "application/json"},
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# Tool lookup tables (keys are lowercase)
+HELP_RESPONSES = {
+    "services": "We offer customer support, technical assistance, and general inquiries.",
+    "hours": "Our call center is open 24/7 for your convenience.",
+    "contact": "You can reach us through this voice call or visit our website.",
+    "support": "Our support team can help with account issues, technical problems, and general questions."
+}
+DEFAULT_HELP_RESPONSE = "I can help with services, hours, contact info, and support topics."
 
 @function_tool
 async def get_help_info(
@@ -36,14 +102,7 @@ async def get_help_info(
     """Provides help information about various topics."""
     logger.info(f"Function called: get_help_info with topic: {topic}")
     
-    help_responses = {
-        "services": "We offer customer support, technical assistance, and general inquiries.",
-        "hours": "Our call center is open 24/7 for your convenience.",
-        "contact": "You can reach us through this voice call or visit our website.",
-        "support": "Our support team can help with account issues, technical problems, and general questions."
-    }
-    
-    return {"info": help_responses.get(topic.lower(), "I can help with services, hours, contact info, and support topics.")}
+    return {"info": HELP_RESPONSES.get(topic.lower(), DEFAULT_HELP_RESPONSE)}
 
 @function_tool
 async def schedule_callback(
@@ -57,51 +116,121 @@ async def schedule_callback(
     return {
         "status": "scheduled",
         "message": f"I've scheduled a callback for {time}. Reason: {reason}",
-        "reference": f"CB-{hash(time + reason) % 10000:04d}"
+        # crc32 is stable across processes, unlike str hash() (PYTHONHASHSEED)
+        "reference": f"CB-{(zlib.crc32(time.encode()) ^ zlib.crc32(reason.encode())) % 10000:04d}"
     }
 
 async def send_transcript_to_analysis(call_id: str, transcript: str):
     """Send transcript to analysis API"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:8000/api/v1/call-analysis/analyze/transcript",
-                json={
-                    "call_id": call_id,
-                    "transcript": transcript
-                },
-                timeout=30.0
-            )
+        # Transcripts compress well; level 1 keeps the CPU cost negligible
+        response = await get_http_client().post(
+            "http://localhost:8000/api/v1/call-analysis/analyze/transcript",
+            content=gzip.compress(orjson.dumps({
+                "call_id": call_id,
+                "transcript": transcript
+            }), compresslevel=1),
+            headers={"Content-Encoding": "gzip"},
+            timeout=30.0
+        )
+        
+        if response.status_code == 200:
+            logger.info("Transcript sent for analysis: %s (%s)", call_id, response.http_version)
+            return response.json()
+        else:
+            logger.error(f"Failed to send transcript: {response.status_code}")
+            return None
             
-            if response.status_code == 200:
-                logger.info(f"Transcript sent for analysis: {call_id}")
-                return response.json()
-            else:
-                logger.error(f"Failed to send transcript: {response.status_code}")
-                return None
-                
     except Exception as e:
         logger.error(f"Error sending transcript to analysis: {e}")
         return None
 
+async def send_transcript_segments(call_id: str, segments: list):
+    """Append a batch of transcript lines to the call without triggering analysis"""
+    try:
+        response = await get_http_client().post(
+            "http://localhost:8000/api/v1/call-analysis/analyze/transcript/incremental",
+            content=orjson.dumps({
+                "call_id": call_id,
+                "segments": segments
+            }),
+            timeout=10.0
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"Failed to send transcript segments: {response.status_code}")
+            
+    except Exception as e:
+        logger.error(f"Error sending transcript segments: {e}")
+
 async def update_call_status(call_id: str, status: str, **kwargs):
+    """Queue a call status update for the backend.
+    
+    Updates are sent by a background worker, which merges updates queued for
+    the same call within a short window into a single PUT.
+    """
+    global _status_queue, _status_worker
+    if _status_queue is None:
+        _status_queue = asyncio.Queue()
+    if _status_worker is None or _status_worker.done():
+        _status_worker = asyncio.create_task(_call_status_worker())
+    
+    update_data = {"call_status": status}
+    update_data.update(kwargs)
+    await _status_queue.put((call_id, update_data))
+
+async def flush_call_status_updates():
+    """Wait until every queued call status update has been sent"""
+    if _status_queue is not None:
+        await _status_queue.join()
+
+async def drain_pending_requests():
+    """Wait for queued call status updates, then close the HTTP client"""
+    await flush_call_status_updates()
+    await close_http_client()
+
+async def _call_status_worker():
+    """Drain the status queue in batches, one PUT per call per batch"""
+    loop = asyncio.get_running_loop()
+    while True:
+        call_id, update_data = await _status_queue.get()
+        pending = {call_id: update_data}
+        taken = 1
+        deadline = loop.time() + STATUS_BATCH_WINDOW
+        
+        while taken < STATUS_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                call_id, update_data = await asyncio.wait_for(_status_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            # Later fields win, e.g. "completed" replaces "answered"
+            pending.setdefault(call_id, {}).update(update_data)
+            taken += 1
+        
+        await asyncio.gather(*(
+            _send_call_status(call_id, update_data)
+            for call_id, update_data in pending.items()
+        ))
+        for _ in range(taken):
+            _status_queue.task_done()
+
+async def _send_call_status(call_id: str, update_data: dict):
     """Update call status in backend"""
     try:
-        async with httpx.AsyncClient() as client:
-            update_data = {"call_status": status}
-            update_data.update(kwargs)
-            
-            response = await client.put(
-                f"http://localhost:8000/api/v1/calls/{call_id}",
-                json=update_data,
-                timeout=10.0
-            )
+        response = await get_http_client().put(
+            f"http://localhost:8000/api/v1/calls/{call_id}",
+            content=orjson.dumps(update_data),
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            logger.info("Call status updated: %s -> %s", call_id, update_data["call_status"])
+        else:
+            logger.error(f"Failed to update call status: {response.status_code}")
             
-            if response.status_code == 200:
-                logger.info(f"Call status updated: {call_id} -> {status}")
-            else:
-                logger.error(f"Failed to update call status: {response.status_code}")
-                
     except Exception as e:
         logger.error(f"Error updating call status: {e}")
 
@@ -110,26 +239,82 @@ class TranscriptCollector:
     
     def __init__(self, call_id: str):
         self.call_id = call_id
-        self.transcript_parts = []
-        self.last_update = datetime.utcnow()
+        # Running transcript text, appended per segment so reads don't re-join
+        self._buffer = io.StringIO()
+        self.segment_count = 0
+        self._last_update_ts = time.time()
+        # Segments not yet streamed to the backend, flushed in batches
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._flush_tasks = set()
     
     def add_text(self, text: str, speaker: str = "unknown"):
         """Add text to transcript"""
-        timestamp = datetime.utcnow().strftime("%H:%M:%S")
-        self.transcript_parts.append(f"[{timestamp}] {speaker}: {text}")
-        self.last_update = datetime.utcnow()
-        logger.info(f"Added to transcript ({self.call_id}): {speaker}: {text[:50]}...")
+        now = time.time()
+        # UTC HH:MM:SS, formatted by hand rather than through strftime
+        day_seconds = int(now) % 86400
+        timestamp = f"{day_seconds // 3600:02d}:{day_seconds // 60 % 60:02d}:{day_seconds % 60:02d}"
+        line = f"[{timestamp}] {speaker}: {text}"
+        if self.segment_count:
+            self._buffer.write("\n")
+        self._buffer.write(line)
+        self.segment_count += 1
+        self._pending.append(line)
+        self._last_update_ts = now
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Added to transcript (%s): %s: %.50s...", self.call_id, speaker, text)
+    
+    @property
+    def last_update(self) -> datetime:
+        """Time the last segment was added (naive UTC)"""
+        return datetime.utcfromtimestamp(self._last_update_ts)
+    
+    def should_flush(self) -> bool:
+        """Whether enough segments or time have accumulated to send a batch"""
+        return bool(self._pending) and (
+            len(self._pending) >= TRANSCRIPT_FLUSH_SEGMENTS
+            or time.monotonic() - self._last_flush >= TRANSCRIPT_FLUSH_INTERVAL
+        )
+    
+    def flush_in_background(self):
+        """Send pending segments from a background task if a batch is due"""
+        if self.should_flush():
+            task = asyncio.create_task(self._flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush(self):
+        """Send pending segments to the incremental transcript endpoint"""
+        segments, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        if segments:
+            await send_transcript_segments(self.call_id, segments)
     
     def get_full_transcript(self) -> str:
         """Get complete transcript"""
-        return "\n".join(self.transcript_parts)
+        return self._buffer.getvalue()
     
     async def send_for_analysis(self):
         """Send transcript for analysis"""
-        if self.transcript_parts:
+        # The full transcript supersedes any unsent batches. Batches already
+        # in flight are awaited, not cancelled (the server may have applied
+        # them), so no late $concat lands after the full write
+        self._pending = []
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        if self.segment_count:
             full_transcript = self.get_full_transcript()
             await send_transcript_to_analysis(self.call_id, full_transcript)
 
+def prewarm(proc: JobProcess):
+    """Load the VAD model once per worker process, shared by all jobs"""
+    # Short end-of-speech silence so the agent takes its turn sooner; the
+    # tradeoff is more, shorter user turns when callers pause mid-sentence
+    proc.userdata["vad"] = silero.VAD.load(
+        min_silence_duration=0.2,
+        activation_threshold=0.5,
+    )
+
 async def entrypoint(ctx: JobContext):
     """Enhanced agent entrypoint with analysis integration"""
     logger.info(f"=== ENHANCED AGENT STARTED ===")
@@ -141,8 +326,7 @@ async def entrypoint(ctx: JobContext):
     
     try:
         if ctx.room.metadata:
-            import json
-            metadata = json.loads(ctx.room.metadata)
+            metadata = orjson.loads(ctx.room.metadata)
             call_id = metadata.get("call_id")
             project_id = metadata.get("project_id")
             logger.info(f"Room metadata: call_id={call_id}, project_id={project_id}")
@@ -154,6 +338,10 @@ async def entrypoint(ctx: JobContext):
         call_id = f"call-{ctx.room.name}"
         logger.info(f"Generated call_id: {call_id}")
     
+    # The shared client is closed when the job shuts down, after pending
+    # status updates have been sent, not from inside this job's teardown
+    ctx.add_shutdown_callback(drain_pending_requests)
+    
     # Initialize transcript collector
     transcript_collector = TranscriptCollector(call_id)
     current_calls[ctx.room.name] = {
@@ -179,21 +367,30 @@ async def entrypoint(ctx: JobContext):
         
         # Create session
         session = AgentSession(
-            vad=silero.VAD.load(),
-            stt=openai.STT(),
+            vad=ctx.proc.userdata["vad"],
+            # Pinning the language skips detection; callers are greeted in Turkish
+            stt=openai.STT(language="tr"),
             llm=openai.LLM(model="gpt-4o-mini"),
             tts=openai.TTS(voice="alloy"),
         )
         logger.info("Agent session created successfully")
+        
+        session_closed = asyncio.Event()
+        session.on("close", lambda *_: session_closed.set())
+        ctx.room.on("disconnected", lambda *_: session_closed.set())
 
-        # Hook into session events for transcript collection
+        # Hook into session events for transcript collection. The emitter
+        # only accepts sync callbacks, so handlers record the text inline and
+        # hand any network I/O to a background task.
         @session.on("user_speech_committed")
         def on_user_speech(text: str):
             transcript_collector.add_text(text, "Customer")
+            transcript_collector.flush_in_background()
         
         @session.on("agent_speech_committed") 
         def on_agent_speech(text: str):
             transcript_collector.add_text(text, "Agent")
+            transcript_collector.flush_in_background()
 
         # Start the agent session
         await session.start(agent=agent, room=ctx.room)
@@ -218,30 +415,9 @@ async def entrypoint(ctx: JobContext):
         
         logger.info("=== AGENT READY AND LISTENING ===")
         
-        # Monitor session and handle cleanup
-        async def monitor_session():
-            try:
-                while True:
-                    await asyncio.sleep(10)  # Check every 10 seconds
-                    
-                    # Check if room is still active
-                    if not session._started:
-                        logger.info("Session ended, performing cleanup")
-                        break
-                        
-            except asyncio.CancelledError:
-                logger.info("Monitor task cancelled")
-            except Exception as e:
-                logger.error(f"Monitor error: {e}")
-        
-        # Start monitoring task
-        monitor_task = asyncio.create_task(monitor_session())
-        
-        # Wait for session to end
-        try:
-            await monitor_task
-        except asyncio.CancelledError:
-            pass
+        # Park until the session closes or the room disconnects
+        await session_closed.wait()
+        logger.info("Session ended, performing cleanup")
         
     except Exception as e:
         logger.error(f"Fatal error in agent entrypoint: {e}")
@@ -252,29 +428,26 @@ async def entrypoint(ctx: JobContext):
         # Cleanup and send transcript for analysis
         logger.info("Agent cleanup started")
         
-        if ctx.room.name in current_calls:
-            call_data = current_calls[ctx.room.name]
-            transcript_collector = call_data["transcript_collector"]
-            
-            # Update call status to completed
-            if call_id:
-                await update_call_status(
-                    call_id,
-                    "completed",
-                    ended_at=datetime.utcnow().isoformat()
-                )
-            
-            # Send transcript for analysis
-            try:
-                await transcript_collector.send_for_analysis()
-                logger.info(f"Transcript sent for analysis: {call_id}")
-            except Exception as e:
-                logger.error(f"Failed to send transcript for analysis: {e}")
-            
-            # Cleanup
-            del current_calls[ctx.room.name]
+        # Mark the call completed and send the transcript for analysis
+        # concurrently; neither depends on the other. The local collector is
+        # used since the current_calls entry may already have expired.
+        cleanup_steps = [transcript_collector.send_for_analysis()]
+        if call_id:
+            cleanup_steps.append(update_call_status(
+                call_id,
+                "completed",
+                ended_at=datetime.utcnow().isoformat()
+            ))
+        
+        results = await asyncio.gather(*cleanup_steps, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Cleanup step failed for {call_id}: {result}")
+        
+        # Cleanup
+        current_calls.pop(ctx.room.name, None)
         
         logger.info("=== AGENT CLEANUP COMPLETED ===")
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -5,12 +5,14 @@ Free LiveKit Agent using only Silero (no API keys required)
 import asyncio
 import logging
 import os
+import zlib
 from dotenv import load_dotenv
 
 from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     RunContext,
     WorkerOptions,
     cli,
@@ -23,6 +25,17 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Tool lookup tables (keys are lowercase)
+COMPANY_INFO = {
+    "services": "We provide AI-powered call center solutions, customer support automation, and voice assistants.",
+    "hours": "Our services are available 24/7 for maximum convenience.",
+    "contact": "You can reach us through this voice interface or visit our website.",
+    "location": "We operate globally with offices in major cities.",
+    "pricing": "We offer flexible pricing plans to suit businesses of all sizes."
+}
+DEFAULT_COMPANY_INFO = "I can provide info about services, hours, contact, location, and pricing."
+
+
 @function_tool
 async def get_company_info(
     context: RunContext,
@@ -30,15 +43,7 @@ async def get_company_info(
 ):
     """Get information about our company and services."""
     
-    company_info = {
-        "services": "We provide AI-powered call center solutions, customer support automation, and voice assistants.",
-        "hours": "Our services are available 24/7 for maximum convenience.",
-        "contact": "You can reach us through this voice interface or visit our website.",
-        "location": "We operate globally with offices in major cities.",
-        "pricing": "We offer flexible pricing plans to suit businesses of all sizes."
-    }
-    
-    return {"information": company_info.get(info_type.lower(), "I can provide info about services, hours, contact, location, and pricing.")}
+    return {"information": COMPANY_INFO.get(info_type.lower(), DEFAULT_COMPANY_INFO)}
 
 
 @function_tool
@@ -52,10 +57,15 @@ async def schedule_callback(
     return {
         "status": "scheduled",
         "message": f"I've scheduled a callback for {preferred_time} regarding {topic}. You'll receive a confirmation shortly.",
-        "reference": f"CB-{hash(preferred_time + topic) % 10000:04d}"
+        "reference": f"CB-{(zlib.crc32(preferred_time.encode()) ^ zlib.crc32(topic.encode())) % 10000:04d}"
     }
 
 
+def prewarm(proc: JobProcess):
+    """Load the VAD model once per worker process, shared by all jobs"""
+    proc.userdata["vad"] = silero.VAD.load()
+
+
 async def entrypoint(ctx: JobContext):
     """Free agent entrypoint using only Silero"""
     logger.info(f"Free Agent started for room: {ctx.room.name}")
@@ -75,7 +85,7 @@ async def entrypoint(ctx: JobContext):
     
     # Create session using only Silero (completely free)
     session = AgentSession(
-        vad=silero.VAD.load(),    # Voice Activity Detection
+        vad=ctx.proc.userdata["vad"],  # Voice Activity Detection
         stt=silero.STT(),         # Speech to Text
         llm=silero.LLM(),         # Large Language Model
         tts=silero.TTS(),         # Text to Speech
@@ -91,4 +101,4 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -193,7 +193,7 @@ export default function CallsPage() {
           }`}>
             {value ? 'Complete' : 'Pending'}
           </span>
-          {row.transcript && (
+          {row.has_transcript && (
             <DocumentTextIcon className="h-4 w-4 text-gray-400" title="Transcript available" />
           )}
           {row.recording_url && (
@@ -62,6 +62,7 @@ export interface Call {
   duration_seconds?: number
   recording_url?: string
   transcript?: string
+  has_transcript?: boolean
   sentiment?: string
   sentiment_score?: number
   call_summary?: string
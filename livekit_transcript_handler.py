@@ -16,6 +16,13 @@ import httpx
 
 logger = logging.getLogger(__name__)
 
+AUDIO_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
 class LiveKitTranscriptHandler:
     """Handle transcript extraction from LiveKit recordings"""
     
@@ -27,6 +34,13 @@ class LiveKitTranscriptHandler:
         )
         self.openai_client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     
+    def _http_client(self) -> httpx.AsyncClient:
+        """Client for one recording's download and analysis upload, closed when that's done"""
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            transport=httpx.AsyncHTTPTransport(retries=3, http2=True),
+        )
+    
     async def start_recording(self, room_name: str, call_id: str) -> Optional[str]:
         """Start recording a room for transcript extraction"""
         try:
@@ -64,10 +78,11 @@ class LiveKitTranscriptHandler:
             if egress.status == api.EgressStatus.EGRESS_COMPLETE:
                 # Download recording file
                 recording_url = egress.file_results[0].download_url
-                transcript = await self._extract_transcript_from_url(recording_url)
-                
-                # Send transcript for analysis
-                await self._send_transcript_for_analysis(call_id, transcript)
+                async with self._http_client() as http_client:
+                    transcript = await self._extract_transcript_from_url(http_client, recording_url)
+                    
+                    # Send transcript for analysis
+                    await self._send_transcript_for_analysis(http_client, call_id, transcript)
                 
                 return transcript
             else:
@@ -78,83 +93,83 @@ class LiveKitTranscriptHandler:
             logger.error(f"Failed to get transcript: {e}")
             return None
     
-    async def _extract_transcript_from_url(self, audio_url: str) -> str:
+    async def _extract_transcript_from_url(self, http_client: httpx.AsyncClient, audio_url: str) -> str:
         """Extract transcript from audio file URL using OpenAI Whisper"""
         try:
-            # Download audio file
-            async with httpx.AsyncClient() as client:
-                response = await client.get(audio_url)
-                
-                if response.status_code == 200:
-                    # Save to temporary file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                        temp_file.write(response.content)
-                        temp_file_path = temp_file.name
-                    
-                    # Use OpenAI Whisper for transcription
-                    with open(temp_file_path, "rb") as audio_file:
-                        transcript_response = await self.openai_client.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=audio_file,
-                            response_format="verbose_json",
-                            timestamp_granularities=["segment"]
-                        )
-                    
-                    # Clean up temp file
-                    os.unlink(temp_file_path)
-                    
-                    # Format transcript with timestamps
-                    formatted_transcript = self._format_transcript_with_timestamps(
-                        transcript_response.segments
-                    )
-                    
-                    return formatted_transcript
-                else:
+            # Stream the recording to a temporary file so memory use doesn't
+            # grow with call length
+            async with http_client.stream("GET", audio_url) as response:
+                if response.status_code != 200:
                     logger.error(f"Failed to download audio: {response.status_code}")
                     return ""
-                    
+                
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
+                    async for chunk in response.aiter_bytes(AUDIO_DOWNLOAD_CHUNK_SIZE):
+                        temp_file.write(chunk)
+                    temp_file_path = temp_file.name
+            
+            # Read and remove the file off the event loop. The SDK would read a
+            # file object synchronously anyway, and Whisper caps uploads at 25 MB.
+            audio_bytes = await asyncio.to_thread(_read_file, temp_file_path)
+            await asyncio.to_thread(os.unlink, temp_file_path)
+            
+            # Use OpenAI Whisper for transcription
+            transcript_response = await self.openai_client.audio.transcriptions.create(
+                model="whisper-1",
+                file=("audio.wav", audio_bytes, "audio/wav"),
+                response_format="verbose_json",
+                timestamp_granularities=["segment"]
+            )
+            
+            # Format transcript with timestamps
+            formatted_transcript = self._format_transcript_with_timestamps(
+                transcript_response.segments
+            )
+            
+            return formatted_transcript
+                
         except Exception as e:
             logger.error(f"Transcript extraction failed: {e}")
             return ""
     
     def _format_transcript_with_timestamps(self, segments) -> str:
-        """Format transcript segments with timestamps"""
-        formatted_lines = []
-        
-        for segment in segments:
-            start_time = self._format_timestamp(segment.start)
-            text = segment.text.strip()
-            formatted_lines.append(f"[{start_time}] {text}")
-        
-        return "\n".join(formatted_lines)
-    
-    def _format_timestamp(self, seconds: float) -> str:
-        """Format seconds to MM:SS format"""
-        minutes = int(seconds // 60)
-        seconds = int(seconds % 60)
-        return f"{minutes:02d}:{seconds:02d}"
+        """Format transcript segments with [MM:SS] timestamps"""
+        # Single pass with integer divmod per segment, no per-line helper call
+        return "\n".join(
+            f"[{minutes:02d}:{seconds:02d}] {segment.text.strip()}"
+            for segment in segments
+            for minutes, seconds in (divmod(int(segment.start), 60),)
+        )
     
-    async def _send_transcript_for_analysis(self, call_id: str, transcript: str):
+    async def _send_transcript_for_analysis(self, http_client: httpx.AsyncClient, call_id: str, transcript: str):
         """Send transcript to analysis API"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "http://localhost:8000/api/v1/call-analysis/analyze/transcript",
-                    json={
-                        "call_id": call_id,
-                        "transcript": transcript
-                    },
-                    timeout=30.0
-                )
+            response = await http_client.post(
+                "http://localhost:8000/api/v1/call-analysis/analyze/transcript",
+                json={
+                    "call_id": call_id,
+                    "transcript": transcript
+                },
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                logger.info(f"Transcript sent for analysis: {call_id} ({response.http_version})")
+            else:
+                logger.error(f"Failed to send transcript: {response.status_code}")
                 
-                if response.status_code == 200:
-                    logger.info(f"Transcript sent for analysis: {call_id}")
-                else:
-                    logger.error(f"Failed to send transcript: {response.status_code}")
-                    
         except Exception as e:
             logger.error(f"Error sending transcript: {e}")
 
 
-# Global transcript handler instance
-transcript_handler = LiveKitTranscriptHandler()
\ No newline at end of file
+# Global transcript handler instance, created on first use so importing this
+# module doesn't build API clients before the environment is loaded
+_transcript_handler: Optional[LiveKitTranscriptHandler] = None
+
+
+def get_transcript_handler() -> LiveKitTranscriptHandler:
+    """Get the shared transcript handler"""
+    global _transcript_handler
+    if _transcript_handler is None:
+        _transcript_handler = LiveKitTranscriptHandler()
+    return _transcript_handler
\ No newline at end of file
@@ -5,8 +5,10 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from database import init_db, close_mongo_connection
+from api.middleware import GzipRequestMiddleware
 from api.routes import projects, agents, campaigns, calls, analytics, call_analysis
 
 logging.basicConfig(level=logging.INFO)
@@ -32,7 +34,8 @@ app = FastAPI(
     title="LiveKit Call Center",
     description="AI-powered call center with project-based call management",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -44,6 +47,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Agents upload transcripts gzip-compressed
+app.add_middleware(GzipRequestMiddleware)
+
 # Include API routes
 app.include_router(projects.router, prefix="/api/v1/projects", tags=["projects"])
 app.include_router(agents.router, prefix="/api/v1/agents", tags=["agents"])
@@ -72,5 +78,13 @@ async def health_check():
 
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop and httptools are pinned in requirements.txt; uvloop isn't available on Windows
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
\ No newline at end of file
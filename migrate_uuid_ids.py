@@ -0,0 +1,148 @@
+"""
+One-off migration: convert string ids to native BSON UUIDs
+
+Documents created before ids switched to uuid.UUID store `_id` and every
+cross-reference field as 36-char strings. This rewrites them as BSON binary
+subtype 4 so they match what the models now write and query with.
+
+Usage: python migrate_uuid_ids.py [--dry-run]
+"""
+
+import asyncio
+import logging
+import sys
+from uuid import UUID
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from database import MONGODB_URL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Collection name -> reference fields holding other documents' ids
+REFERENCE_FIELDS = {
+    "projects": [],
+    "ai_agents": ["project_id"],
+    "contacts": ["project_id"],
+    "campaigns": ["project_id", "ai_agent_id"],
+    "calls": ["project_id", "campaign_id", "contact_id", "ai_agent_id"],
+    "call_analytics": ["call_id", "project_id"],
+    "call_analysis": ["call_id"],
+    "group_calls": ["campaign_id"],
+    "group_call_participants": ["group_call_id", "contact_id"],
+}
+
+
+def to_uuid(value):
+    """Parse a string id into a UUID, leaving anything else untouched"""
+    if isinstance(value, str):
+        try:
+            return UUID(value)
+        except ValueError:
+            return value
+    return value
+
+
+def unique_indexes(index_info: dict) -> dict:
+    """Unique secondary indexes (everything unique except _id), by name"""
+    return {
+        name: spec for name, spec in index_info.items()
+        if spec.get("unique") and name != "_id_"
+    }
+
+
+async def find_unique_conflicts(collection, name: str, indexes: dict) -> int:
+    """Count documents whose unique keys would collide once ids are UUIDs.
+    
+    A string and a UUID holding the same value are distinct keys today, but
+    become equal after conversion (e.g. one contact already migrated and one
+    not, with the same project and phone number).
+    """
+    conflicts = 0
+    for index_name, spec in indexes.items():
+        fields = [field for field, _ in spec["key"]]
+        seen = set()
+        query = spec.get("partialFilterExpression", {})
+        async for doc in collection.find(query, {field: 1 for field in fields}):
+            values = [doc.get(field) for field in fields]
+            if None in values:
+                # Missing keys are already unique-checked (or exempt when sparse)
+                continue
+            key = tuple(str(to_uuid(value)) for value in values)
+            if key in seen:
+                conflicts += 1
+                logger.error(f"{name}: {index_name} would collide on {key} (document {doc['_id']!r})")
+            seen.add(key)
+    return conflicts
+
+
+async def migrate_collection(database, name: str, fields: list, dry_run: bool) -> int:
+    """Convert ids in one collection. Returns the number of documents rewritten."""
+    collection = database[name]
+    migrated = 0
+    
+    indexes = unique_indexes(await collection.index_information())
+    if await find_unique_conflicts(collection, name, indexes):
+        raise RuntimeError(f"{name}: resolve the duplicate keys above before migrating")
+    
+    if dry_run:
+        migrated = await collection.count_documents({"_id": {"$type": "string"}})
+        if indexes:
+            logger.info(f"{name}: would drop and rebuild unique indexes {sorted(indexes)}")
+        logger.info(f"{name}: would migrate {migrated} documents")
+        return migrated
+    
+    # Each document is re-inserted under its UUID key before the old copy is
+    # deleted, so for a moment both carry the same unique secondary keys.
+    # Those indexes are dropped for the copy and rebuilt afterwards.
+    for index_name in indexes:
+        await collection.drop_index(index_name)
+    
+    try:
+        # Reference fields first, in place (the _id stays the same)
+        for field in fields:
+            async for doc in collection.find({field: {"$type": "string"}}, {field: 1}):
+                new_value = to_uuid(doc[field])
+                if isinstance(new_value, UUID):
+                    await collection.update_one({"_id": doc["_id"]}, {"$set": {field: new_value}})
+        
+        # _id is immutable, so each document is re-inserted under the UUID key
+        async for doc in collection.find({"_id": {"$type": "string"}}):
+            old_id = doc["_id"]
+            new_id = to_uuid(old_id)
+            if not isinstance(new_id, UUID):
+                logger.warning(f"{name}: skipping non-UUID id {old_id!r}")
+                continue
+            
+            doc["_id"] = new_id
+            await collection.insert_one(doc)
+            await collection.delete_one({"_id": old_id})
+            migrated += 1
+    finally:
+        for index_name, spec in indexes.items():
+            options = {
+                option: value for option, value in spec.items()
+                if option not in ("key", "v", "ns")
+            }
+            await collection.create_index(spec["key"], name=index_name, **options)
+    
+    logger.info(f"{name}: migrated {migrated} documents")
+    return migrated
+
+
+async def main(dry_run: bool = False):
+    client = AsyncIOMotorClient(MONGODB_URL, uuidRepresentation="standard")
+    database = client.get_default_database()
+
+    try:
+        total = 0
+        for name, fields in REFERENCE_FIELDS.items():
+            total += await migrate_collection(database, name, fields, dry_run)
+        logger.info(f"Done: {total} documents")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(dry_run="--dry-run" in sys.argv))
@@ -1,94 +1,113 @@
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
-from beanie import Document, Indexed
+from typing import Annotated, List, Optional, Dict, Any, Tuple
+from uuid import UUID, uuid4
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+from beanie import Document, Indexed, Replace, Save, SaveChanges, before_event
 from pymongo import IndexModel
-import uuid
+from pymongo.errors import BulkWriteError
+
+
+# Stored timestamps are naive UTC throughout (routes and agents compare them
+# against datetime.utcnow()), so the default factories stay naive too
+_utcnow = datetime.utcnow
 
 
 class Project(Document):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
+    id: UUID = Field(default_factory=uuid4, alias="_id")
     name: str
     description: Optional[str] = None
     created_by: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
     is_active: bool = True
     
+    @before_event(Save, Replace, SaveChanges)
+    def touch(self):
+        """Refresh updated_at on every write"""
+        self.updated_at = _utcnow()
+    
     class Settings:
         name = "projects"
+        use_state_management = True
         indexes = [
             IndexModel([("created_by", 1)]),
             IndexModel([("created_at", -1)]),
-            IndexModel([("is_active", 1)])
+            IndexModel([("is_active", 1)], partialFilterExpression={"is_active": True})
         ]
 
 
 class AIAgent(Document):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    project_id: Indexed(str)
+    id: UUID = Field(default_factory=uuid4, alias="_id")
+    project_id: Annotated[UUID, Indexed()]
     name: str
     prompt: str
     voice_settings: Dict[str, Any] = Field(default_factory=dict)
     behavior_settings: Dict[str, Any] = Field(default_factory=dict)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
     is_active: bool = True
     
+    @before_event(Save, Replace, SaveChanges)
+    def touch(self):
+        """Refresh updated_at on every write"""
+        self.updated_at = _utcnow()
+    
     class Settings:
         name = "ai_agents"
+        use_state_management = True
         indexes = [
-            IndexModel([("project_id", 1)]),
-            IndexModel([("is_active", 1)])
+            IndexModel([("is_active", 1)], partialFilterExpression={"is_active": True})
         ]
 
 
 class Contact(Document):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    project_id: Indexed(str)
+    id: UUID = Field(default_factory=uuid4, alias="_id")
+    project_id: UUID
     name: str
     phone_number: str
     email: Optional[str] = None
     notes: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
+    
+    @before_event(Save, Replace, SaveChanges)
+    def touch(self):
+        """Refresh updated_at on every write"""
+        self.updated_at = _utcnow()
     
     class Settings:
         name = "contacts"
+        use_state_management = True
         indexes = [
-            IndexModel([("project_id", 1), ("phone_number", 1)], unique=True),
-            IndexModel([("project_id", 1)]),
-            IndexModel([("phone_number", 1)])
+            IndexModel([("project_id", 1), ("phone_number", 1)], unique=True)
         ]
 
 
 class Campaign(Document):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    project_id: Indexed(str)
-    ai_agent_id: Optional[str] = None
+    id: UUID = Field(default_factory=uuid4, alias="_id")
+    project_id: UUID
+    ai_agent_id: Optional[UUID] = None
     name: str
     description: Optional[str] = None
     campaign_type: str  # 'individual', 'group', 'batch'
     status: str = "pending"  # 'pending', 'active', 'paused', 'completed'
     scheduled_at: Optional[datetime] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
     
     class Settings:
         name = "campaigns"
         indexes = [
-            IndexModel([("project_id", 1)]),
-            IndexModel([("status", 1)]),
-            IndexModel([("campaign_type", 1)])
+            IndexModel([("project_id", 1), ("status", 1), ("campaign_type", 1)])
         ]
 
 
 class Call(Document):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    project_id: Indexed(str)
-    campaign_id: Optional[str] = None
-    contact_id: Optional[str] = None
-    ai_agent_id: Optional[str] = None
+    id: UUID = Field(default_factory=uuid4, alias="_id")
+    project_id: UUID
+    campaign_id: Optional[UUID] = None
+    contact_id: Optional[UUID] = None
+    ai_agent_id: Optional[UUID] = None
     
     # LiveKit info
     room_name: Optional[str] = None
@@ -98,10 +117,10 @@ class Call(Document):
     # Call details
     call_type: str  # 'inbound', 'outbound'
     phone_number: str
-    call_status: str = "initiated"  # 'initiated', 'ringing', 'answered', 'completed', 'failed', 'no_answer'
+    call_status: str = "initiated"  # 'initiating' (SIP), 'initiated', 'ringing', 'answered', 'completed', 'failed', 'no_answer'
     
     # Timing
-    started_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime = Field(default_factory=_utcnow)
     answered_at: Optional[datetime] = None
     ended_at: Optional[datetime] = None
     duration_seconds: Optional[int] = None
@@ -112,31 +131,123 @@ class Call(Document):
     
     # Analysis
     sentiment: Optional[str] = None  # positive, negative, neutral
-    sentiment_score: Optional[float] = None  # -1.00 to 1.00
+    sentiment_score_x100: Optional[int] = None  # -100 to 100, i.e. sentiment_score * 100
     call_summary: Optional[str] = None
     key_points: List[str] = Field(default_factory=list)
     action_items: List[str] = Field(default_factory=list)
     call_outcome: Optional[str] = None
     analysis_completed: bool = False
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _convert_sentiment_score(cls, data: Any) -> Any:
+        """Accept sentiment_score as a float (older documents, constructor kwargs)"""
+        if isinstance(data, dict) and "sentiment_score" in data and data.get("sentiment_score_x100") is None:
+            data = dict(data)
+            score = data.pop("sentiment_score")
+            data["sentiment_score_x100"] = None if score is None else round(score * 100)
+        return data
+    
+    @computed_field
+    @property
+    def sentiment_score(self) -> Optional[float]:
+        """Sentiment from -1.00 to 1.00, stored as a fixed-point int"""
+        if self.sentiment_score_x100 is None:
+            return None
+        return self.sentiment_score_x100 / 100
+    
+    @sentiment_score.setter
+    def sentiment_score(self, value: Optional[float]):
+        self.sentiment_score_x100 = None if value is None else round(value * 100)
     
     class Settings:
         name = "calls"
+        # Write-heavy: no revision id, cache or re-validation on save
+        use_revision = False
+        use_cache = False
+        validate_on_save = False
+        # Compound indexes follow the route filters: equality fields first,
+        # then started_at for the sort / date range. Each one serves a query;
+        # every extra index is paid on every call write
         indexes = [
-            IndexModel([("project_id", 1)]),
-            IndexModel([("contact_id", 1)]),
-            IndexModel([("campaign_id", 1)]),
-            IndexModel([("started_at", -1)]),
-            IndexModel([("call_status", 1)]),
-            IndexModel([("phone_number", 1)])
+            # Call list (status/type filters applied while walking in date
+            # order), analytics date ranges, project call counts
+            IndexModel([("project_id", 1), ("started_at", -1)]),
+            # Campaign stats and the worker's pending-call pickup
+            IndexModel([("campaign_id", 1), ("call_status", 1)]),
+            # Contact call history
+            IndexModel([("contact_id", 1), ("started_at", -1)]),
+            # Agent stats and agent performance
+            IndexModel([("ai_agent_id", 1), ("started_at", -1)]),
+            # LiveKit room names are long opaque strings only ever matched by
+            # equality, so a hashed index stores a fixed 8-byte key per call
+            IndexModel([("room_name", "hashed")]),
+            # Only in-progress calls; the completed tail never enters this index.
+            # Named so a change to the filter replaces the index rather than
+            # conflicting with the default call_status_1 name
+            IndexModel(
+                [("call_status", 1)],
+                name="call_status_in_progress",
+                partialFilterExpression={"call_status": {"$in": ["initiating", "initiated", "ringing", "answered"]}}
+            )
         ]
 
 
+class CallListItem(BaseModel):
+    """Call row for list views, without the transcript and analysis text"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: UUID = Field(alias="_id")
+    project_id: UUID
+    campaign_id: Optional[UUID] = None
+    contact_id: Optional[UUID] = None
+    ai_agent_id: Optional[UUID] = None
+    call_type: str
+    phone_number: str
+    call_status: str
+    started_at: datetime
+    answered_at: Optional[datetime] = None
+    ended_at: Optional[datetime] = None
+    duration_seconds: Optional[int] = None
+    recording_url: Optional[str] = None
+    sentiment: Optional[str] = None
+    sentiment_score: Optional[float] = None
+    call_outcome: Optional[str] = None
+    analysis_completed: bool = False
+    has_transcript: bool = False
+
+    class Settings:
+        projection = {
+            "_id": 1, "project_id": 1, "campaign_id": 1, "contact_id": 1, "ai_agent_id": 1,
+            "call_type": 1, "phone_number": 1, "call_status": 1,
+            "started_at": 1, "answered_at": 1, "ended_at": 1, "duration_seconds": 1,
+            "recording_url": 1, "sentiment": 1,
+            "sentiment_score": {"$ifNull": [{"$divide": ["$sentiment_score_x100", 100]}, "$sentiment_score"]},
+            "call_outcome": 1, "analysis_completed": 1,
+            # Computed server-side so the transcript itself never leaves the database
+            "has_transcript": {"$gt": [{"$strLenCP": {"$ifNull": ["$transcript", ""]}}, 0]},
+        }
+
+
+class Emotions(BaseModel):
+    """Sentiment breakdown stored on CallAnalytics"""
+    model_config = ConfigDict(extra="ignore")
+
+    positive: float = 0.0
+    neutral: float = 0.0
+    negative: float = 0.0
+    # Running sentiment over the call, -1.0 to 1.0
+    average_sentiment: float = 0.0
+    sentiment_min: float = 0.0
+    sentiment_max: float = 0.0
+
+
 class CallAnalytics(Document):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    call_id: Indexed(str)
-    project_id: Indexed(str)
+    id: UUID = Field(default_factory=uuid4, alias="_id")
+    call_id: Annotated[UUID, Indexed(unique=True)]
+    project_id: Annotated[UUID, Indexed()]
     
     # Conversation metrics
     total_words: Optional[int] = None
@@ -146,7 +257,7 @@ class CallAnalytics(Document):
     interruptions_count: Optional[int] = None
     
     # Sentiment analysis
-    emotions: Dict[str, float] = Field(default_factory=dict)
+    emotions: Emotions = Field(default_factory=Emotions)
     confidence_scores: Dict[str, float] = Field(default_factory=dict)
     
     # Performance metrics
@@ -154,20 +265,20 @@ class CallAnalytics(Document):
     task_completion_rate: Optional[float] = None
     customer_satisfaction_score: Optional[int] = None  # 1-5 scale
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
     
     class Settings:
         name = "call_analytics"
-        indexes = [
-            IndexModel([("call_id", 1)], unique=True),
-            IndexModel([("project_id", 1)])
-        ]
+        # Write-heavy: no revision id, cache or re-validation on save
+        use_revision = False
+        use_cache = False
+        validate_on_save = False
 
 
 class CallAnalysis(Document):
     """Advanced call analysis with AI-powered insights"""
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    call_id: Indexed(str)
+    id: UUID = Field(default_factory=uuid4, alias="_id")
+    call_id: Annotated[UUID, Indexed(unique=True)]
     
     # Sentiment Analysis
     sentiment: str  # positive, negative, neutral
@@ -189,13 +300,12 @@ class CallAnalysis(Document):
     customer_satisfaction: float = 0.0  # 0-1 scale
     
     # Analysis metadata
-    analysis_timestamp: datetime = Field(default_factory=datetime.utcnow)
+    analysis_timestamp: datetime = Field(default_factory=_utcnow)
     analysis_version: str = "1.0"
     
     class Settings:
         name = "call_analysis"
         indexes = [
-            IndexModel([("call_id", 1)], unique=True),
             IndexModel([("sentiment", 1)]),
             IndexModel([("call_outcome", 1)]),
             IndexModel([("analysis_timestamp", -1)])
@@ -203,63 +313,87 @@ class CallAnalysis(Document):
 
 
 class GroupCall(Document):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    campaign_id: Indexed(str)
+    id: UUID = Field(default_factory=uuid4, alias="_id")
+    campaign_id: Annotated[UUID, Indexed()]
     room_name: str
     max_participants: int = 10
-    started_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime = Field(default_factory=_utcnow)
     ended_at: Optional[datetime] = None
     status: str = "active"  # 'active', 'ended'
     
     class Settings:
         name = "group_calls"
         indexes = [
-            IndexModel([("campaign_id", 1)]),
             IndexModel([("room_name", 1)]),
             IndexModel([("status", 1)])
         ]
 
 
 class GroupCallParticipant(Document):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    group_call_id: Indexed(str)
-    contact_id: Optional[str] = None
+    id: UUID = Field(default_factory=uuid4, alias="_id")
+    group_call_id: UUID
+    contact_id: Optional[UUID] = None
     participant_id: Optional[str] = None
     phone_number: str
-    joined_at: datetime = Field(default_factory=datetime.utcnow)
+    joined_at: datetime = Field(default_factory=_utcnow)
     left_at: Optional[datetime] = None
     participation_duration_seconds: Optional[int] = None
     
     class Settings:
         name = "group_call_participants"
         indexes = [
-            IndexModel([("group_call_id", 1)]),
-            IndexModel([("contact_id", 1)]),
-            IndexModel([("phone_number", 1)])
+            IndexModel([("group_call_id", 1), ("phone_number", 1)]),
+            IndexModel([("contact_id", 1)])
+        ]
+
+
+async def bulk_create_calls(calls: List[Call]) -> Tuple[List[Call], List[Dict[str, Any]]]:
+    """Insert many calls in one round trip; unordered, so a bad document doesn't stop the rest.
+    
+    Returns the inserted calls and one {"index", "phone_number", "error"} entry per rejected call.
+    """
+    if not calls:
+        return [], []
+    try:
+        await Call.insert_many(calls, ordered=False)
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        failed_indexes = {error["index"] for error in write_errors}
+        failed = [
+            {"index": error["index"], "phone_number": calls[error["index"]].phone_number, "error": error.get("errmsg")}
+            for error in write_errors
         ]
+        inserted = [call for index, call in enumerate(calls) if index not in failed_indexes]
+        return inserted, failed
+    return calls, []
 
 
 # Pydantic models for API requests/responses
-class ProjectCreate(BaseModel):
+class APIModel(BaseModel):
+    """Base for request bodies: unknown fields are dropped, not rejected"""
+    model_config = ConfigDict(extra="ignore")
+
+
+class ProjectCreate(APIModel):
     name: str
     description: Optional[str] = None
 
 
-class ProjectUpdate(BaseModel):
+class ProjectUpdate(APIModel):
     name: Optional[str] = None
     description: Optional[str] = None
     is_active: Optional[bool] = None
 
 
-class AIAgentCreate(BaseModel):
-    project_id: str
+class AIAgentCreate(APIModel):
+    project_id: UUID
     name: str
     prompt: str
     voice_settings: Optional[Dict[str, Any]] = None
     behavior_settings: Optional[Dict[str, Any]] = None
 
 
-class AIAgentUpdate(BaseModel):
+class AIAgentUpdate(APIModel):
     name: Optional[str] = None
     prompt: Optional[str] = None
     voice_settings: Optional[Dict[str, Any]] = None
@@ -267,8 +401,8 @@ class AIAgentUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
-class ContactCreate(BaseModel):
-    project_id: str
+class ContactCreate(APIModel):
+    project_id: UUID
     name: str
     phone_number: str
     email: Optional[str] = None
@@ -276,7 +410,7 @@ class ContactCreate(BaseModel):
     tags: Optional[List[str]] = None
 
 
-class ContactUpdate(BaseModel):
+class ContactUpdate(APIModel):
     name: Optional[str] = None
     phone_number: Optional[str] = None
     email: Optional[str] = None
@@ -284,33 +418,38 @@ class ContactUpdate(BaseModel):
     tags: Optional[List[str]] = None
 
 
-class CampaignCreate(BaseModel):
-    project_id: str
-    ai_agent_id: Optional[str] = None
+class CampaignCreate(APIModel):
+    project_id: UUID
+    ai_agent_id: Optional[UUID] = None
     name: str
     description: Optional[str] = None
     campaign_type: str
     scheduled_at: Optional[datetime] = None
 
 
-class CampaignUpdate(BaseModel):
+class CampaignUpdate(APIModel):
     name: Optional[str] = None
     description: Optional[str] = None
-    ai_agent_id: Optional[str] = None
+    ai_agent_id: Optional[UUID] = None
     status: Optional[str] = None
     scheduled_at: Optional[datetime] = None
 
 
-class CallCreate(BaseModel):
-    project_id: str
-    campaign_id: Optional[str] = None
-    contact_id: Optional[str] = None
-    ai_agent_id: Optional[str] = None
+class CallCreate(APIModel):
+    project_id: UUID
+    campaign_id: Optional[UUID] = None
+    contact_id: Optional[UUID] = None
+    ai_agent_id: Optional[UUID] = None
     call_type: str
     phone_number: str
 
 
-class CallUpdate(BaseModel):
+class BulkCallResult(BaseModel):
+    inserted: List[Call]
+    failed: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class CallUpdate(APIModel):
     call_status: Optional[str] = None
     answered_at: Optional[datetime] = None
     ended_at: Optional[datetime] = None
@@ -321,4 +460,10 @@ class CallUpdate(BaseModel):
     call_summary: Optional[str] = None
     key_points: Optional[List[str]] = None
     action_items: Optional[List[str]] = None
-    call_outcome: Optional[str] = None
\ No newline at end of file
+    call_outcome: Optional[str] = None
+
+
+DOCUMENT_MODELS = (
+    Project, AIAgent, Contact, Campaign, Call,
+    CallAnalytics, CallAnalysis, GroupCall, GroupCallParticipant,
+)
@@ -11,6 +11,7 @@ from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     RunContext,
     WorkerOptions,
     cli,
@@ -22,6 +23,24 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+HELP_RESPONSES = {
+    "services": "We offer customer support, technical assistance, and general inquiries.",
+    "hours": "Our call center is open 24/7 for your convenience.",
+    "contact": "You can reach us through this voice call or visit our website.",
+    "support": "Our support team can help with account issues, technical problems, and general questions."
+}
+DEFAULT_HELP_RESPONSE = "I can help with services, hours, contact info, and support topics."
+HELP_TOPICS = frozenset(HELP_RESPONSES)
+# Shared result for unknown topics; tool results are only serialized, never mutated
+DEFAULT_HELP_INFO = {"info": DEFAULT_HELP_RESPONSE}
+
+# Simulated weather data
+SIMULATED_WEATHER = {
+    "weather": "partly cloudy",
+    "temperature": "22°C",
+    "forecast": "Pleasant day ahead!"
+}
+
 
 @function_tool
 async def get_help_info(
@@ -30,14 +49,8 @@ async def get_help_info(
 ):
     """Provides help information about various topics."""
     
-    help_responses = {
-        "services": "We offer customer support, technical assistance, and general inquiries.",
-        "hours": "Our call center is open 24/7 for your convenience.",
-        "contact": "You can reach us through this voice call or visit our website.",
-        "support": "Our support team can help with account issues, technical problems, and general questions."
-    }
-    
-    return {"info": help_responses.get(topic.lower(), "I can help with services, hours, contact info, and support topics.")}
+    topic = topic.lower()
+    return {"info": HELP_RESPONSES[topic]} if topic in HELP_TOPICS else DEFAULT_HELP_INFO
 
 
 @function_tool
@@ -47,13 +60,32 @@ async def check_weather(
 ):
     """Check weather information for a location."""
     
-    # Simulated weather data
-    return {
-        "location": location,
-        "weather": "partly cloudy", 
-        "temperature": "22°C",
-        "forecast": "Pleasant day ahead!"
-    }
+    return {"location": location, **SIMULATED_WEATHER}
+
+
+AGENT_INSTRUCTIONS = """You are a helpful and friendly call center assistant built by LiveKit. 
+        You can speak both Turkish and English fluently.
+        Be professional, courteous, and helpful to all callers.
+        Use the available tools to provide accurate information.
+        Keep responses concise but informative."""
+
+AGENT_TOOLS = [get_help_info, check_weather]
+
+
+def prewarm(proc: JobProcess):
+    """Load the VAD model and build the provider clients once per worker process"""
+    proc.userdata["vad"] = silero.VAD.load()  # Voice Activity Detection (works without API key)
+    # Choose STT provider (comment/uncomment as needed)
+    # proc.userdata["stt"] = deepgram.STT(model="nova-2")  # Requires Deepgram API key
+    proc.userdata["stt"] = openai.STT()  # Requires OpenAI API key
+    
+    # Choose LLM provider
+    proc.userdata["llm"] = openai.LLM(model="gpt-4o-mini")  # Requires OpenAI API key
+    
+    # Choose TTS provider
+    # proc.userdata["tts"] = silero.TTS()  # Free option (not available)
+    # proc.userdata["tts"] = elevenlabs.TTS()  # Requires ElevenLabs API key
+    proc.userdata["tts"] = openai.TTS(voice="alloy")  # Requires OpenAI API key
 
 
 async def entrypoint(ctx: JobContext):
@@ -63,29 +95,15 @@ async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
     # Create agent with instructions and tools
-    agent = Agent(
-        instructions="""You are a helpful and friendly call center assistant built by LiveKit. 
-        You can speak both Turkish and English fluently.
-        Be professional, courteous, and helpful to all callers.
-        Use the available tools to provide accurate information.
-        Keep responses concise but informative.""",
-        tools=[get_help_info, check_weather],
-    )
+    agent = Agent(instructions=AGENT_INSTRUCTIONS, tools=AGENT_TOOLS)
     
-    # Create session with AI components
+    # Create session with the AI components loaded in prewarm
+    userdata = ctx.proc.userdata
     session = AgentSession(
-        vad=silero.VAD.load(),  # Voice Activity Detection (works without API key)
-        # Choose STT provider (comment/uncomment as needed)
-        # stt=deepgram.STT(model="nova-2"),  # Requires Deepgram API key
-        stt=openai.STT(),  # Requires OpenAI API key
-        
-        # Choose LLM provider
-        llm=openai.LLM(model="gpt-4o-mini"),  # Requires OpenAI API key
-        
-        # Choose TTS provider
-        # tts=silero.TTS(),  # Free option (not available)
-        # tts=elevenlabs.TTS(),  # Requires ElevenLabs API key
-        tts=openai.TTS(voice="alloy"),  # Requires OpenAI API key
+        vad=userdata["vad"],
+        stt=userdata["stt"],
+        llm=userdata["llm"],
+        tts=userdata["tts"],
     )
 
     # Start the agent session
@@ -98,4 +116,4 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -4,18 +4,25 @@ Enhanced agent with voice, text, and data processing capabilities
 """
 
 import asyncio
+import bisect
 import logging
 import os
 import json
+import re
+from collections import deque
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from cachetools import TTLCache
+
 from livekit.agents import (
     JobContext,
     AutoSubscribe,
 )
 from livekit.agents.voice_assistant import VoiceAssistant
 from livekit.agents.llm import (
+    LLM as BaseLLM,
     ChatContext,
     ChatMessage,
     ChatRole,
@@ -45,29 +52,236 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Simple sentiment analysis (in production, use proper sentiment analysis)
+POSITIVE_WORDS = frozenset(["good", "great", "excellent", "satisfied", "happy", "thanks", "appreciate"])
+NEGATIVE_WORDS = frozenset(["bad", "terrible", "awful", "angry", "frustrated", "upset", "disappointed"])
+
+# Common call center patterns for key point extraction
+KEY_PHRASE_PATTERNS = frozenset([
+    "billing issue", "payment problem", "technical support", 
+    "account access", "service inquiry", "complaint",
+    "refund request", "upgrade", "cancellation"
+])
+
+
+def compile_phrases(phrases) -> re.Pattern:
+    """One alternation regex over the phrases, so a text is scanned once instead of once per phrase.
+    
+    Matches must start at a word boundary (so "bad" doesn't match inside
+    "sinbad") but may run on into inflections like "appreciated" or "upgrades".
+    """
+    alternation = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})")
+
+
+POSITIVE_RE = compile_phrases(POSITIVE_WORDS)
+NEGATIVE_RE = compile_phrases(NEGATIVE_WORDS)
+KEY_PHRASE_RE = compile_phrases(KEY_PHRASE_PATTERNS)
+
+# Texts longer than this are scanned in a worker thread. A single utterance
+# takes microseconds, so below it the thread hop would cost more than it saves
+OFFLOAD_TEXT_CHARS = 4096
+
+
+def score_sentiment(text: str) -> Optional[float]:
+    """Sentiment in [-1, 1], or None when the text has no sentiment words"""
+    # Each distinct word counts once, however often it appears
+    text_lower = text.lower()
+    positive_count = len(set(POSITIVE_RE.findall(text_lower)))
+    negative_count = len(set(NEGATIVE_RE.findall(text_lower)))
+    
+    if positive_count + negative_count == 0:
+        return None
+    
+    return (positive_count - negative_count) / (positive_count + negative_count)
+
+
+def find_key_phrases(text: str) -> List[str]:
+    """Distinct key phrases in order of first appearance"""
+    return list(dict.fromkeys(KEY_PHRASE_RE.findall(text.lower())))
+
+
+async def analyze_text(fn, text: str):
+    """Run a text scan, off the event loop when the text is large"""
+    if len(text) > OFFLOAD_TEXT_CHARS:
+        return await asyncio.to_thread(fn, text)
+    return fn(text)
+
+# VAD model shared by every call in this process, loaded on first use
+vad_model = None
+vad_lock = asyncio.Lock()
+
+
+async def get_vad():
+    """Get the shared VAD model, loading it off the event loop the first time"""
+    global vad_model
+    async with vad_lock:
+        if vad_model is None:
+            vad_model = await asyncio.to_thread(rtc.VAD.load)
+    return vad_model
+
+
+# Two-tier LLM routing: short turns with no sign of needing a tool go to
+# the fast model, everything else to the full one
+FAST_LLM_MODEL = "gpt-4o-mini"
+FULL_LLM_MODEL = "gpt-4-turbo-preview"
+FAST_LLM_MAX_CHARS = 120
+TOOL_HINT_RE = re.compile(
+    r"\d{3,}|phone|number|transfer|callback|call back|refund|billing|payment|account|"
+    r"cancel|upgrade|complaint|manager|telefon|numara|fatura|iptal|şikayet"
+)
+
+# Customer satisfaction from average sentiment: <= -0.3 -> 1, <= 0.3 -> 3, above -> 5
+CSAT_THRESHOLDS = (-0.3, 0.3)
+CSAT_SCORES = (1, 3, 5)
+
+# Turns kept in memory per call
+CONVERSATION_HISTORY_TURNS = 200
+
+# Call mutations made within this window are written in a single save
+CALL_SAVE_DEBOUNCE = 0.2
+
+# Recently looked-up contacts, keyed by (project_id, phone_number). Short TTL
+# so edits made in the dashboard show up within a minute.
+contact_cache: TTLCache = TTLCache(maxsize=512, ttl=60)
+
+
+# Static part of the enhanced system prompt, appended to the agent's own prompt
+SYSTEM_PROMPT_SUFFIX = """
+ADDITIONAL CAPABILITIES:
+You have access to the following functions:
+- lookup_customer(phone_number): Find customer information
+- set_call_outcome(outcome, summary): Set call resolution status
+- add_action_item(action): Add follow-up tasks
+- schedule_callback(time, reason): Schedule customer callbacks
+- transfer_call(department, reason): Transfer to other departments
+
+CALL CENTER GUIDELINES:
+1. Always be professional and empathetic
+2. Listen actively and ask clarifying questions
+3. Use available functions to provide better service
+4. Document important information and action items
+5. Resolve issues when possible or escalate appropriately
+6. Summarize next steps clearly before ending calls
+
+CONVERSATION FLOW:
+1. Greet the customer warmly
+2. Gather their phone number and look up their information
+3. Listen to their inquiry or concern
+4. Use available tools and knowledge to assist
+5. Document outcomes and next steps
+6. Ensure customer satisfaction before ending
+
+Remember: Your goal is to provide excellent customer service while efficiently resolving inquiries.
+"""
+
+
+@lru_cache(maxsize=64)
+def build_system_prompt(agent_prompt: str) -> str:
+    """Enhanced system prompt for an agent; keyed by the prompt text, so config edits miss the cache"""
+    return f"\n{agent_prompt}\n{SYSTEM_PROMPT_SUFFIX}"
+
+
+class TieredLLM(BaseLLM):
+    """Routes each turn to the fast or the full LLM; both carry the same tools"""
+    
+    def __init__(self, fast: BaseLLM, full: BaseLLM):
+        super().__init__()
+        self.fast = fast
+        self.full = full
+    
+    def pick(self, chat_ctx: ChatContext) -> BaseLLM:
+        """Fast model only for a short, tool-free user turn"""
+        last = chat_ctx.messages[-1] if chat_ctx.messages else None
+        if last is None or last.role != ChatRole.USER or not isinstance(last.content, str):
+            # Tool results and anything multimodal need the full model
+            return self.full
+        text = last.content.lower()
+        if len(text) > FAST_LLM_MAX_CHARS or TOOL_HINT_RE.search(text):
+            return self.full
+        return self.fast
+    
+    def chat(self, *, chat_ctx: ChatContext, **kwargs):
+        return self.pick(chat_ctx).chat(chat_ctx=chat_ctx, **kwargs)
+    
+    def prewarm(self):
+        """Open both tiers' provider connections"""
+        self.fast.prewarm()
+        self.full.prewarm()
+
 
 class MultimodalCallCenterAgent:
     """Enhanced multimodal agent with advanced capabilities"""
     
     def __init__(self, agent_config: AIAgent):
         self.agent_config = agent_config
+        
+        # Resolve behavior settings once, at construction
+        behavior_settings = agent_config.behavior_settings or {}
+        self.temperature = behavior_settings.get("temperature", 0.7)
+        self.max_tokens = behavior_settings.get("max_tokens", 500)
+        self.greeting = behavior_settings.get("greeting") or (
+            f"Merhaba! Ben {agent_config.name}. Size nasıl yardımcı olabilirim? Öncelikle telefon numaranızı öğrenebilir miyim?"
+        )
+        
         self.current_call = None
         self.contact_info = None
-        self.conversation_history = []
+        # Recent turns only; analytics are accumulated incrementally, so long
+        # calls don't need the full history in memory
+        self.conversation_history = deque(maxlen=CONVERSATION_HISTORY_TURNS)
         self.call_analytics = {
-            "sentiment_scores": [],
-            "key_topics": [],
+            # Running sentiment stats, so call end needs no pass over every turn
+            "sentiment_sum": 0.0,
+            "sentiment_count": 0,
+            "sentiment_min": 0.0,
+            "sentiment_max": 0.0,
+            "key_topics": set(),
             "action_items": [],
             "customer_intent": None,
             "resolution_status": "pending"
         }
+        
+        # Write-behind for current_call: tools mark it dirty and return
+        # straight away, a background task coalesces the saves
+        self._call_dirty = asyncio.Event()
+        self._call_flusher: Optional[asyncio.Task] = None
+    
+    def mark_call_dirty(self):
+        """Schedule a debounced save of current_call"""
+        if self._call_flusher is None or self._call_flusher.done():
+            self._call_flusher = asyncio.create_task(self._flush_call_loop())
+        self._call_dirty.set()
+    
+    async def _flush_call_loop(self):
+        """Save current_call once per burst of mutations"""
+        while True:
+            await self._call_dirty.wait()
+            await asyncio.sleep(CALL_SAVE_DEBOUNCE)
+            self._call_dirty.clear()
+            try:
+                await self.current_call.save()
+            except Exception as e:
+                logger.error(f"Error saving call: {e}")
+    
+    async def stop_call_flusher(self):
+        """Stop the write-behind task; the caller saves current_call itself afterwards"""
+        if self._call_flusher is not None:
+            self._call_flusher.cancel()
+            try:
+                await self._call_flusher
+            except asyncio.CancelledError:
+                pass
+            self._call_flusher = None
     
     async def create_enhanced_llm(self):
         """Create LLM with function calling capabilities"""
         if not LLM:
             raise RuntimeError("OpenAI plugin not available")
         
-        # Enhanced system functions for call center operations
+        # Enhanced system functions for call center operations.
+        # Calls emitted in one LLM turn are executed concurrently by the
+        # framework; the mutating tools only touch in-memory state and
+        # mark_call_dirty() without awaiting in between, so they can't interleave.
         fnc_ctx = FunctionContext()
         
         # Customer lookup function
@@ -77,7 +291,16 @@ class MultimodalCallCenterAgent:
         ) -> str:
             """Look up customer information by phone number"""
             try:
-                contact = await Contact.find_one(Contact.phone_number == phone_number)
+                cache_key = (self.agent_config.project_id, phone_number)
+                contact = contact_cache.get(cache_key)
+                if contact is None:
+                    # Scoped to the agent's project, which the (project_id, phone_number) index serves
+                    contact = await Contact.find_one(
+                        Contact.project_id == self.agent_config.project_id,
+                        Contact.phone_number == phone_number
+                    )
+                    if contact:
+                        contact_cache[cache_key] = contact
                 if contact:
                     self.contact_info = contact
                     return f"Customer found: {contact.name}, Email: {contact.email or 'N/A'}, Notes: {contact.notes or 'None'}"
@@ -98,7 +321,7 @@ class MultimodalCallCenterAgent:
                 if self.current_call:
                     self.current_call.call_outcome = outcome
                     self.current_call.call_summary = summary
-                    await self.current_call.save()
+                    self.mark_call_dirty()
                     self.call_analytics["resolution_status"] = outcome
                     return f"Call outcome set to: {outcome}"
                 return "No active call to update"
@@ -117,7 +340,7 @@ class MultimodalCallCenterAgent:
                     if not self.current_call.action_items:
                         self.current_call.action_items = []
                     self.current_call.action_items.append(action)
-                    await self.current_call.save()
+                    self.mark_call_dirty()
                     self.call_analytics["action_items"].append(action)
                     return f"Action item added: {action}"
                 return "No active call to add action item"
@@ -152,54 +375,30 @@ class MultimodalCallCenterAgent:
                     transfer_note = f"Transferred to {department} - Reason: {reason}"
                     self.current_call.call_outcome = "transferred"
                     self.current_call.call_summary = transfer_note
-                    await self.current_call.save()
+                    self.mark_call_dirty()
                     return f"Call being transferred to {department}. Please hold while I connect you."
                 return "No active call to transfer"
             except Exception as e:
                 logger.error(f"Error transferring call: {e}")
                 return "Unable to transfer call at this time"
         
-        return LLM(
-            model="gpt-4-turbo-preview",
-            temperature=self.agent_config.behavior_settings.get("temperature", 0.7),
-            max_tokens=self.agent_config.behavior_settings.get("max_tokens", 500),
-            function_context=fnc_ctx,
+        fast, full = (
+            LLM(
+                model=model,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                function_context=fnc_ctx,
+            )
+            for model in (FAST_LLM_MODEL, FULL_LLM_MODEL)
         )
+        return TieredLLM(fast, full)
     
     async def create_enhanced_chat_context(self, room_name: str) -> ChatContext:
         """Create enhanced chat context with multimodal capabilities"""
         initial_ctx = ChatContext()
         
-        # Enhanced system prompt
-        system_prompt = f"""
-{self.agent_config.prompt}
-
-ADDITIONAL CAPABILITIES:
-You have access to the following functions:
-- lookup_customer(phone_number): Find customer information
-- set_call_outcome(outcome, summary): Set call resolution status
-- add_action_item(action): Add follow-up tasks
-- schedule_callback(time, reason): Schedule customer callbacks
-- transfer_call(department, reason): Transfer to other departments
-
-CALL CENTER GUIDELINES:
-1. Always be professional and empathetic
-2. Listen actively and ask clarifying questions
-3. Use available functions to provide better service
-4. Document important information and action items
-5. Resolve issues when possible or escalate appropriately
-6. Summarize next steps clearly before ending calls
-
-CONVERSATION FLOW:
-1. Greet the customer warmly
-2. Gather their phone number and look up their information
-3. Listen to their inquiry or concern
-4. Use available tools and knowledge to assist
-5. Document outcomes and next steps
-6. Ensure customer satisfaction before ending
-
-Remember: Your goal is to provide excellent customer service while efficiently resolving inquiries.
-"""
+        # Enhanced system prompt, built once per distinct agent prompt
+        system_prompt = build_system_prompt(self.agent_config.prompt)
         
         initial_ctx.messages.append(
             ChatMessage(
@@ -213,19 +412,18 @@ Remember: Your goal is to provide excellent customer service while efficiently r
     async def analyze_conversation_sentiment(self, text: str) -> float:
         """Analyze sentiment of conversation text"""
         try:
-            # Simple sentiment analysis (in production, use proper sentiment analysis)
-            positive_words = ["good", "great", "excellent", "satisfied", "happy", "thanks", "appreciate"]
-            negative_words = ["bad", "terrible", "awful", "angry", "frustrated", "upset", "disappointed"]
-            
-            text_lower = text.lower()
-            positive_count = sum(1 for word in positive_words if word in text_lower)
-            negative_count = sum(1 for word in negative_words if word in text_lower)
-            
-            if positive_count + negative_count == 0:
+            sentiment = await analyze_text(score_sentiment, text)
+            if sentiment is None:
                 return 0.0  # Neutral
             
-            sentiment = (positive_count - negative_count) / (positive_count + negative_count)
-            self.call_analytics["sentiment_scores"].append(sentiment)
+            stats = self.call_analytics
+            if stats["sentiment_count"]:
+                stats["sentiment_min"] = min(stats["sentiment_min"], sentiment)
+                stats["sentiment_max"] = max(stats["sentiment_max"], sentiment)
+            else:
+                stats["sentiment_min"] = stats["sentiment_max"] = sentiment
+            stats["sentiment_sum"] += sentiment
+            stats["sentiment_count"] += 1
             
             return sentiment
             
@@ -237,21 +435,9 @@ Remember: Your goal is to provide excellent customer service while efficiently r
         """Extract key points from conversation"""
         try:
             # Simple keyword extraction (in production, use NLP libraries)
-            key_phrases = []
-            
-            # Look for common call center patterns
-            patterns = [
-                "billing issue", "payment problem", "technical support", 
-                "account access", "service inquiry", "complaint",
-                "refund request", "upgrade", "cancellation"
-            ]
+            key_phrases = await analyze_text(find_key_phrases, conversation_text)
             
-            text_lower = conversation_text.lower()
-            for pattern in patterns:
-                if pattern in text_lower:
-                    key_phrases.append(pattern)
-                    
-            self.call_analytics["key_topics"].extend(key_phrases)
+            self.call_analytics["key_topics"].update(key_phrases)
             return key_phrases
             
         except Exception as e:
@@ -265,41 +451,49 @@ Remember: Your goal is to provide excellent customer service while efficiently r
                 return
             
             # Calculate average sentiment
-            if self.call_analytics["sentiment_scores"]:
-                avg_sentiment = sum(self.call_analytics["sentiment_scores"]) / len(self.call_analytics["sentiment_scores"])
+            stats = self.call_analytics
+            has_sentiment = stats["sentiment_count"] > 0
+            avg_sentiment = stats["sentiment_sum"] / stats["sentiment_count"] if has_sentiment else 0.0
+            if has_sentiment:
                 self.current_call.sentiment_score = avg_sentiment
             
             # Set key points
             if self.call_analytics["key_topics"]:
-                self.current_call.key_points = list(set(self.call_analytics["key_topics"]))
+                self.current_call.key_points = list(self.call_analytics["key_topics"])
             
             # Set action items
             if self.call_analytics["action_items"]:
                 self.current_call.action_items = self.call_analytics["action_items"]
             
-            await self.current_call.save()
-            
             # Create detailed analytics record
             analytics_data = {
                 "call_id": self.current_call.id,
                 "project_id": self.current_call.project_id,
                 "emotions": {
-                    "average_sentiment": avg_sentiment if self.call_analytics["sentiment_scores"] else 0.0,
-                    "sentiment_range": {
-                        "min": min(self.call_analytics["sentiment_scores"]) if self.call_analytics["sentiment_scores"] else 0.0,
-                        "max": max(self.call_analytics["sentiment_scores"]) if self.call_analytics["sentiment_scores"] else 0.0
-                    }
+                    "average_sentiment": avg_sentiment,
+                    "sentiment_min": stats["sentiment_min"],
+                    "sentiment_max": stats["sentiment_max"]
                 },
                 "confidence_scores": {
                     "topic_extraction": 0.8,
                     "sentiment_analysis": 0.75
                 },
                 "task_completion_rate": 1.0 if self.call_analytics["resolution_status"] == "resolved" else 0.5,
-                "customer_satisfaction_score": 5 if avg_sentiment > 0.3 else (3 if avg_sentiment > -0.3 else 1) if self.call_analytics["sentiment_scores"] else None
+                "customer_satisfaction_score": CSAT_SCORES[bisect.bisect_left(CSAT_THRESHOLDS, avg_sentiment)] if has_sentiment else None
             }
             
             analytics = CallAnalytics(**analytics_data)
-            await analytics.save()
+            
+            # Independent documents, so both writes go out together
+            call_result, analytics_result = await asyncio.gather(
+                self.current_call.save(),
+                analytics.save(),
+                return_exceptions=True
+            )
+            if isinstance(call_result, Exception):
+                logger.error(f"Error saving call {self.current_call.id}: {call_result}")
+            if isinstance(analytics_result, Exception):
+                logger.error(f"Error saving analytics for call {self.current_call.id}: {analytics_result}")
             
             logger.info(f"Updated call analytics for call {self.current_call.id}")
             
@@ -360,12 +554,17 @@ async def multimodal_entrypoint(ctx: JobContext):
         if not (llm and stt and tts):
             raise RuntimeError("Required AI components not available")
         
+        # Open the provider connections up front (no billable requests), so
+        # the first customer turn doesn't pay for connection setup
+        for model in (stt, llm, tts):
+            model.prewarm()
+        
         # Create enhanced chat context
         chat_ctx = await multimodal_agent.create_enhanced_chat_context(ctx.room.name)
         
         # Create voice assistant
         assistant = VoiceAssistant(
-            vad=rtc.VAD.load(),
+            vad=await get_vad(),
             stt=stt,
             llm=llm,
             tts=tts,
@@ -383,23 +582,24 @@ async def multimodal_entrypoint(ctx: JobContext):
             logger.info(f"Participant disconnected: {participant.identity}")
             asyncio.create_task(handle_participant_disconnected(participant, multimodal_agent))
         
-        # Monitor conversation for analytics
-        original_say = assistant.say
-        async def enhanced_say(text: str, **kwargs):
-            await multimodal_agent.handle_conversation_update(text, is_agent=True)
-            return await original_say(text, **kwargs)
-        assistant.say = enhanced_say
+        # Monitor conversation for analytics. Committed speech is recorded
+        # after the fact, so analysis never delays TTS
+        @assistant.on("user_speech_committed")
+        def on_user_speech_committed(msg: ChatMessage):
+            if isinstance(msg.content, str) and msg.content:
+                asyncio.create_task(multimodal_agent.handle_conversation_update(msg.content, is_agent=False))
+        
+        @assistant.on("agent_speech_committed")
+        def on_agent_speech_committed(msg: ChatMessage):
+            if isinstance(msg.content, str) and msg.content:
+                asyncio.create_task(multimodal_agent.handle_conversation_update(msg.content, is_agent=True))
         
         # Start the assistant
         assistant.start(ctx.room)
         
         # Wait and greet
         await asyncio.sleep(1)
-        greeting = agent_config.behavior_settings.get(
-            "greeting",
-            f"Merhaba! Ben {agent_config.name}. Size nasıl yardımcı olabilirim? Öncelikle telefon numaranızı öğrenebilir miyim?"
-        )
-        await assistant.say(greeting, allow_interruptions=True)
+        await assistant.say(multimodal_agent.greeting, allow_interruptions=True)
         
     except Exception as e:
         logger.error(f"Error in multimodal entrypoint: {e}")
@@ -413,7 +613,7 @@ async def handle_participant_connected(participant: rtc.RemoteParticipant, agent
             agent.current_call.participant_id = participant.identity
             agent.current_call.call_status = "answered"
             agent.current_call.answered_at = datetime.utcnow()
-            await agent.current_call.save()
+            agent.mark_call_dirty()
             
         logger.info(f"Enhanced handler - participant connected: {participant.identity}")
     except Exception as e:
@@ -424,6 +624,8 @@ async def handle_participant_disconnected(participant: rtc.RemoteParticipant, ag
     """Enhanced participant disconnection handler"""
     try:
         if agent.current_call:
+            # The save below also persists anything still pending in the write-behind
+            await agent.stop_call_flusher()
             agent.current_call.call_status = "completed"
             agent.current_call.ended_at = datetime.utcnow()
             
@@ -4,16 +4,20 @@ Using LiveKit Agent framework events
 """
 
 import asyncio
+import gzip
 import logging
 import os
 import httpx
+import orjson
 from datetime import datetime
+from typing import Optional, Set
 from dotenv import load_dotenv
 
 from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     RunContext,
     WorkerOptions,
     cli,
@@ -21,6 +25,11 @@ from livekit.agents import (
 )
 from livekit.plugins import openai, silero
 
+try:
+    from livekit.plugins import deepgram
+except ImportError:
+    deepgram = None
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,10 +37,60 @@ logger = logging.getLogger(__name__)
 # Global transcript storage
 call_transcripts = {}
 
+# Shared keep-alive client for the backend API
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url="http://localhost:8000",
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=32),
+            # Request bodies are pre-encoded with orjson
+            headers={"Content-Type": "application/json"},
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def create_stt():
+    """Streaming Deepgram STT when configured, OpenAI otherwise"""
+    provider = os.getenv("STT_PROVIDER", "deepgram").lower()
+    if provider == "deepgram" and deepgram and os.getenv("DEEPGRAM_API_KEY"):
+        # Callers are greeted in Turkish; the plugin would otherwise assume en-US
+        return deepgram.STT(
+            model="nova-2-general",
+            language=os.getenv("STT_LANGUAGE", "tr"),
+            interim_results=True,
+        )
+    return openai.STT()
+
+
+# Transcript uploads still in flight after their call ended
+_pending_uploads: Set[asyncio.Task] = set()
+
+
+async def drain_pending_uploads():
+    """Wait for in-flight transcript uploads, then close the HTTP client"""
+    if _pending_uploads:
+        await asyncio.gather(*_pending_uploads, return_exceptions=True)
+    await close_http_client()
+
 class CallTranscript:
     def __init__(self, call_id: str):
         self.call_id = call_id
         self.transcript_lines = []
+        self.seen_ids = set()
         self.started_at = datetime.utcnow()
     
     def add_line(self, speaker: str, text: str):
@@ -40,6 +99,13 @@ class CallTranscript:
         self.transcript_lines.append(line)
         logger.info(f"Transcript: {line}")
     
+    def add_item(self, item_id: str, speaker: str, text: str):
+        """Add a chat item's text, ignoring items already recorded"""
+        if item_id in self.seen_ids:
+            return
+        self.seen_ids.add(item_id)
+        self.add_line(speaker, text)
+    
     def get_full_transcript(self) -> str:
         return "\n".join(self.transcript_lines)
 
@@ -57,27 +123,31 @@ async def get_help_info(context: RunContext, topic: str):
 async def send_transcript_to_analysis(call_id: str, transcript: str):
     """Send transcript to analysis API"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:8000/api/v1/call-analysis/analyze/transcript",
-                json={
-                    "call_id": call_id,
-                    "transcript": transcript
-                },
-                timeout=30.0
-            )
+        # Transcripts compress well; level 1 keeps the CPU cost negligible
+        response = await get_http_client().post(
+            "/api/v1/call-analysis/analyze/transcript",
+            content=gzip.compress(orjson.dumps({
+                "call_id": call_id,
+                "transcript": transcript
+            }), compresslevel=1),
+            headers={"Content-Encoding": "gzip"}
+        )
+        
+        if response.status_code == 200:
+            logger.info(f"Transcript sent for analysis: {call_id}")
+            return response.json()
+        else:
+            logger.error(f"Failed to send transcript: {response.status_code}")
+            return None
             
-            if response.status_code == 200:
-                logger.info(f"Transcript sent for analysis: {call_id}")
-                return response.json()
-            else:
-                logger.error(f"Failed to send transcript: {response.status_code}")
-                return None
-                
     except Exception as e:
         logger.error(f"Error sending transcript to analysis: {e}")
         return None
 
+def prewarm(proc: JobProcess):
+    """Load the VAD model once per worker process, shared by every call it serves"""
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     """Main agent entrypoint with proper transcript handling"""
     logger.info(f"=== PROPER AGENT STARTED ===")
@@ -90,7 +160,18 @@ async def entrypoint(ctx: JobContext):
     transcript = CallTranscript(call_id)
     call_transcripts[call_id] = transcript
     
+    # Uploads started during teardown are awaited when the job shuts down
+    ctx.add_shutdown_callback(drain_pending_uploads)
+    
     try:
+        # Build the models first and open their provider connections while
+        # the room handshake is in flight, so the first turn doesn't pay for it
+        stt = create_stt()
+        llm = openai.LLM(model="gpt-4o-mini")
+        tts = openai.TTS(voice="alloy")
+        for model in (stt, llm, tts):
+            model.prewarm()
+        
         await ctx.connect()
         logger.info("Connected to room successfully")
 
@@ -106,22 +187,26 @@ async def entrypoint(ctx: JobContext):
         
         # Create session
         session = AgentSession(
-            vad=silero.VAD.load(),
-            stt=openai.STT(),
-            llm=openai.LLM(model="gpt-4o-mini"),
-            tts=openai.TTS(voice="alloy"),
+            vad=ctx.proc.userdata["vad"],
+            stt=stt,
+            llm=llm,
+            tts=tts,
         )
         
-        # Manual transcript collection from session internals
-        original_stt_stream = None
-        original_tts_stream = None
+        session_closed = asyncio.Event()
+        session.on("close", lambda *_: session_closed.set())
+        ctx.room.on("disconnected", lambda *_: session_closed.set())
         
-        # Hook into the session's internal components
-        if hasattr(session, '_stt'):
-            original_stt_stream = session._stt
-            
-        if hasattr(session, '_tts'):
-            original_tts_stream = session._tts
+        # Each user turn and agent reply is added to the chat context once,
+        # so it is appended to the transcript as it arrives. Registered before
+        # start so the greeting is captured too.
+        @session.on("conversation_item_added")
+        def on_conversation_item_added(event):
+            item = event.item
+            text = item.text_content
+            if text:
+                speaker = "Customer" if item.role == "user" else "Agent"
+                transcript.add_item(item.id, speaker, text)
 
         # Start the session
         await session.start(agent=agent, room=ctx.room)
@@ -133,36 +218,10 @@ async def entrypoint(ctx: JobContext):
             instructions=f"Say this greeting: {greeting}"
         )
         
-        # Add greeting to transcript
-        transcript.add_line("Agent", greeting)
-        
         logger.info("Agent is ready and listening...")
         
-        # Simple approach: Monitor session and collect available data
-        while True:
-            await asyncio.sleep(2)
-            
-            # Check if we can access session's conversation history
-            if hasattr(session, '_chat_ctx') and session._chat_ctx:
-                try:
-                    # Get latest messages from chat context
-                    messages = session._chat_ctx.messages
-                    
-                    # Process new messages (this is a simplified approach)
-                    for msg in messages[-5:]:  # Get last 5 messages
-                        if hasattr(msg, 'content') and msg.content:
-                            if hasattr(msg, 'role'):
-                                speaker = "Customer" if msg.role == "user" else "Agent"
-                                # Only add if not already in transcript
-                                if msg.content not in [line.split("] ", 1)[-1] for line in transcript.transcript_lines]:
-                                    transcript.add_line(speaker, msg.content)
-                                    
-                except Exception as e:
-                    logger.debug(f"Could not access chat context: {e}")
-            
-            # Simple exit condition (in real implementation, this would be handled by session events)
-            if not hasattr(session, '_started') or not session._started:
-                break
+        await session_closed.wait()
+        logger.info("Session ended")
         
     except Exception as e:
         logger.error(f"Agent error: {e}")
@@ -177,8 +236,10 @@ async def entrypoint(ctx: JobContext):
             logger.info(f"Full transcript ({len(transcript.transcript_lines)} lines):")
             logger.info(full_transcript)
             
-            # Send to analysis API
-            await send_transcript_to_analysis(call_id, full_transcript)
+            # Send to analysis API without holding up teardown
+            task = asyncio.create_task(send_transcript_to_analysis(call_id, full_transcript))
+            _pending_uploads.add(task)
+            task.add_done_callback(_pending_uploads.discard)
         else:
             logger.warning("No transcript collected")
         
@@ -189,4 +250,4 @@ async def entrypoint(ctx: JobContext):
         logger.info("Agent cleanup completed")
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
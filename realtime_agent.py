@@ -6,6 +6,7 @@ import asyncio
 import logging
 import os
 import httpx
+from collections import deque
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -30,7 +31,8 @@ class RealTimeTranscriptCollector:
     
     def __init__(self, call_id: str):
         self.call_id = call_id
-        self.transcript_parts = []
+        # deque appends never reallocate/copy the backing array on long calls
+        self.transcript_parts = deque()
         self.current_user_text = ""
         self.current_agent_text = ""
         self.last_update = datetime.utcnow()
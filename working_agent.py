@@ -6,12 +6,22 @@ Uses minimal setup that works without API keys for basic testing
 import asyncio
 import logging
 import os
-from dotenv import load_dotenv
+import re
+import time
+from types import MappingProxyType
+from typing import Optional
+
+# One math-library thread per process. Every job runs in its own process,
+# so per-process thread pools would oversubscribe the cores. Must be set
+# before the inference runtimes are imported
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
 
 from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     RunContext,
     WorkerOptions,
     cli,
@@ -19,11 +29,35 @@ from livekit.agents import (
 )
 from livekit.plugins import silero
 
-load_dotenv()
+# libuv event loop for the frame-heavy agent I/O. Installed at import time so
+# the job subprocesses, which re-import this module, use it too
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+HELP_RESPONSES = MappingProxyType({
+    "hello": "Merhaba! Size nasıl yardımcı olabilirim?",
+    "help": "Size çeşitli konularda yardımcı olabilirim. Sorularınızı sorabilirsiniz.",
+    "weather": "Hava durumu bilgisi için yerel kaynaklarınızı kontrol edebilirsiniz.",
+    "time": "Şu anki saat sistem saatinize göre belirlenir.",
+    "services": "Müşteri hizmetleri, teknik destek ve genel bilgi konularında yardım edebilirim."
+})
+DEFAULT_HELP_ANSWER = "Üzgünüm, bu konuda size yardımcı olamıyorum. Başka bir soru sorabilir misiniz?"
+
+# All keywords in one pass over the casefolded question
+HELP_KEYWORD_RE = re.compile("|".join(re.escape(key.casefold()) for key in HELP_RESPONSES))
+
+# Tool results built once and returned by reference; the framework only reads them
+HELP_RESULTS = MappingProxyType({key.casefold(): {"answer": answer} for key, answer in HELP_RESPONSES.items()})
+DEFAULT_HELP_RESULT = {"answer": DEFAULT_HELP_ANSWER}
+
+
 @function_tool
 async def get_help(
     context: RunContext,
@@ -31,68 +65,136 @@ async def get_help(
 ):
     """Provides help and information to users."""
     
-    responses = {
-        "hello": "Merhaba! Size nasıl yardımcı olabilirim?",
-        "help": "Size çeşitli konularda yardımcı olabilirim. Sorularınızı sorabilirsiniz.",
-        "weather": "Hava durumu bilgisi için yerel kaynaklarınızı kontrol edebilirsiniz.",
-        "time": "Şu anki saat sistem saatinize göre belirlenir.",
-        "services": "Müşteri hizmetleri, teknik destek ve genel bilgi konularında yardım edebilirim."
-    }
-    
     # Simple keyword matching
-    for key, response in responses.items():
-        if key.lower() in question.lower():
-            return {"answer": response}
+    match = HELP_KEYWORD_RE.search(question.casefold())
+    if match:
+        return HELP_RESULTS[match.group(0)]
     
-    return {"answer": "Üzgünüm, bu konuda size yardımcı olamıyorum. Başka bir soru sorabilir misiniz?"}
+    return DEFAULT_HELP_RESULT
+
+
+# Built once, without source indentation, so the prompt prefix is compact and
+# identical across sessions
+AGENT_INSTRUCTIONS = (
+    "You are a helpful Turkish call center assistant. "
+    "Be friendly and professional. "
+    "Always respond in Turkish unless the user prefers English. "
+    "Keep responses short and helpful."
+)
+
+
+def prewarm(proc: JobProcess):
+    """Load the silero models once per worker process, shared by every session"""
+    # Voice Activity Detection; the plugin runs the Silero ONNX model on
+    # ONNX Runtime's CPU provider with a single intra-op thread
+    proc.userdata["vad"] = silero.VAD.load(force_cpu=True)
+    # Text to Speech; not every silero plugin build ships one, in which case
+    # the entrypoint drops to fallback mode instead of the worker failing
+    try:
+        proc.userdata["tts"] = silero.TTS()
+    except Exception as e:
+        logger.warning("Silero TTS unavailable, sessions will use fallback mode: %s", e)
+        proc.userdata["tts"] = None
+
+
+async def warm_up_tts(tts):
+    """Synthesize a throwaway phrase so the first real utterance doesn't pay model warm-up"""
+    started = time.perf_counter()
+    try:
+        async with tts.synthesize("a") as stream:
+            async for _ in stream:
+                pass
+        logger.info("TTS warm-up took %.2fs", time.perf_counter() - started)
+    except Exception as e:
+        logger.warning("TTS warm-up failed: %s", e)
+
+
+async def park_until_done(ctx: JobContext, session: Optional[AgentSession] = None):
+    """Wait without polling until the room disconnects, the session closes or the job shuts down"""
+    done = asyncio.Event()
+    ctx.room.on("disconnected", lambda *_: done.set())
+    if session is not None:
+        session.on("close", lambda *_: done.set())
+    
+    async def on_shutdown():
+        done.set()
+    ctx.add_shutdown_callback(on_shutdown)
+    
+    # The room may have gone away before the handlers were attached
+    if not ctx.room.isconnected():
+        return
+    await done.wait()
 
 
 async def entrypoint(ctx: JobContext):
     """Working agent entrypoint"""
-    logger.info(f"Working Agent started for room: {ctx.room.name}")
+    logger.info("Working Agent started for room: %s", ctx.room.name)
+    
+    tts = ctx.proc.userdata.get("tts")
+    
+    # First job in this process warms the TTS while the room connects
+    warm_up = None
+    if tts is not None and not ctx.proc.userdata.get("tts_warmed"):
+        ctx.proc.userdata["tts_warmed"] = True
+        warm_up = asyncio.create_task(warm_up_tts(tts))
     
     await ctx.connect()
 
     # Create agent with basic instructions
     agent = Agent(
-        instructions="""You are a helpful Turkish call center assistant. 
-        Be friendly and professional. 
-        Always respond in Turkish unless the user prefers English.
-        Keep responses short and helpful.""",
+        instructions=AGENT_INSTRUCTIONS,
         tools=[get_help],
     )
     
     # Simple session setup - this might work with basic functionality
+    session = None
     try:
+        if tts is None:
+            raise RuntimeError("Silero TTS is not available")
+        
         session = AgentSession(
-            vad=silero.VAD.load(),  # Voice Activity Detection
-            tts=silero.TTS(),       # Text to Speech (should work)
+            vad=ctx.proc.userdata["vad"],
+            tts=tts,
         )
 
         # Start the agent session
+        if warm_up:
+            await warm_up
         await session.start(agent=agent, room=ctx.room)
         
         # Simple greeting without generate_reply
         logger.info("Agent session started successfully")
         
         # Keep alive
-        while True:
-            await asyncio.sleep(1)
+        await park_until_done(ctx, session)
+        await session.aclose()
             
     except Exception as e:
-        logger.error(f"Error starting agent session: {e}")
+        logger.error("Error starting agent session: %s", e)
+        
+        # Release whatever the failed start set up; the prewarmed models
+        # are shared by the process and stay loaded
+        if session is not None:
+            try:
+                await session.aclose()
+            except Exception as close_error:
+                logger.warning("Error closing failed session: %s", close_error)
+            session = None
         
         # Fallback: basic room handling
         logger.info("Using fallback mode...")
         
         @ctx.room.on("participant_connected")
         def on_participant_connected(participant):
-            logger.info(f"Participant connected: {participant.identity}")
+            logger.info("Participant connected: %s", participant.identity)
         
         # Keep agent running
-        while True:
-            await asyncio.sleep(1)
+        await park_until_done(ctx)
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    # Job processes inherit the environment, so .env is only read here
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file